@@ -1,51 +1,207 @@
 #!/usr/bin/env python3
 """Simple HTTP API server with /healthz endpoint and rate limiting."""
 
+import argparse
 import json
 import os
-import threading
+import signal
+import sys
 import time
+from collections import OrderedDict, deque
+from functools import lru_cache
 from http.server import BaseHTTPRequestHandler, HTTPServer
 
+from filecache import FileCache
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, Metrics, TimedLock
+from serving import DEFAULT_WORKERS, SERVER_MODES, AsyncHTTPServer, RoutingMixin, build_server
+
 # ── Config ────────────────────────────────────────────────────────────────────
 
 CONFIG_PATH = os.path.join(os.path.dirname(__file__), "config.json")
 
-def load_version() -> str:
+def _read_version(path: str) -> str:
     try:
-        with open(CONFIG_PATH) as f:
+        with open(path) as f:
             return json.load(f).get("version", "unknown")
     except (FileNotFoundError, json.JSONDecodeError):
         return "unknown"
 
+
+# Re-read only when config.json changes (or on SIGHUP), not on every probe.
+_version_cache = FileCache(CONFIG_PATH, _read_version)
+
+
+def load_version() -> str:
+    return _version_cache.get()
+
 # ── Rate limiter ──────────────────────────────────────────────────────────────
 
 RATE_LIMIT = 60          # requests
 RATE_WINDOW = 60         # seconds
+RATE_SHARDS = 16         # independent lock stripes
+RATE_MAX_KEYS = 100_000  # tracked IPs across all shards before eviction
+
+
+_FLOAT_BYTES = sys.getsizeof(0.0)
+
+
+class _Shard:
+    __slots__ = ("lock", "buckets")
+
+    def __init__(self):
+        self.lock = TimedLock()
+        # ip -> timestamps, oldest first; dict order doubles as LRU order
+        self.buckets: OrderedDict[str, deque[float]] = OrderedDict()
+
+
+class ShardedRateLimiter:
+    """Sliding-window limiter striped across independently locked shards.
+
+    Each IP's timestamps live in a deque trimmed from the left, so a check is
+    O(1) amortized. Each shard holds at most ``max_keys // shards`` IPs: idle
+    keys are evicted lazily on insert, and the least recently seen key goes
+    when the shard is still full, so spoofed ``X-Forwarded-For`` values cannot
+    grow memory without bound.
+    """
+
+    def __init__(self, limit: int, window: float, shards: int = RATE_SHARDS,
+                 max_keys: int = RATE_MAX_KEYS):
+        if shards < 1 or max_keys < shards:
+            raise ValueError("need shards >= 1 and max_keys >= shards")
+        self.limit = limit
+        self.window = window
+        self.max_keys = max_keys
+        self._per_shard = max_keys // shards
+        self._shards = [_Shard() for _ in range(shards)]
+
+    def _shard(self, key: str) -> _Shard:
+        return self._shards[hash(key) % len(self._shards)]
+
+    def check(self, key: str) -> tuple[bool, int]:
+        """Returns (limited, retry_after_seconds) and records the hit if allowed."""
+        now = time.time()
+        cutoff = now - self.window
+        shard = self._shard(key)
+        with shard.lock:
+            buckets = shard.buckets
+            timestamps = buckets.get(key)
+            if timestamps is None:
+                self._make_room(buckets, cutoff)
+                timestamps = buckets[key] = deque()
+            else:
+                buckets.move_to_end(key)
+                while timestamps and timestamps[0] <= cutoff:
+                    timestamps.popleft()
+
+            if len(timestamps) >= self.limit:
+                retry_after = int(self.window - (now - timestamps[0])) + 1
+                return True, retry_after
+            timestamps.append(now)
+            return False, 0
+
+    def _make_room(self, buckets: OrderedDict, cutoff: float) -> None:
+        # Drop keys whose newest hit has left the window, oldest-touched first.
+        while buckets:
+            key, timestamps = next(iter(buckets.items()))
+            if timestamps and timestamps[-1] > cutoff:
+                break
+            del buckets[key]
+        while len(buckets) >= self._per_shard:
+            buckets.popitem(last=False)
+
+    def sweep(self) -> int:
+        """Evict every idle key; returns how many were dropped."""
+        cutoff = time.time() - self.window
+        dropped = 0
+        for shard in self._shards:
+            with shard.lock:
+                idle = [k for k, ts in shard.buckets.items() if not ts or ts[-1] <= cutoff]
+                for key in idle:
+                    del shard.buckets[key]
+                dropped += len(idle)
+        return dropped
+
+    def memory_estimate(self) -> int:
+        """Approximate bytes held by tracked keys and their timestamps."""
+        total = 0
+        for shard in self._shards:
+            with shard.lock:
+                total += sys.getsizeof(shard.buckets)
+                for key, timestamps in shard.buckets.items():
+                    total += sys.getsizeof(key) + sys.getsizeof(timestamps) + _FLOAT_BYTES * len(timestamps)
+        return total
+
+    @property
+    def lock_wait_seconds(self) -> float:
+        return sum(shard.lock.wait_seconds for shard in self._shards)
 
-_rate_lock = threading.Lock()
-_rate_buckets: dict[str, list[float]] = {}  # ip -> list of timestamps
+    def clear(self) -> None:
+        for shard in self._shards:
+            with shard.lock:
+                shard.buckets.clear()
+
+    def __len__(self) -> int:
+        return sum(len(shard.buckets) for shard in self._shards)
+
+
+_limiter = ShardedRateLimiter(RATE_LIMIT, RATE_WINDOW)
+
+
+def use_limiter(limiter) -> None:
+    """Swap the limiter backend; anything with check/clear/__len__/memory_estimate/lock_wait_seconds."""
+    global _limiter
+    _limiter = limiter
 
 
 def is_rate_limited(ip: str) -> tuple[bool, int]:
     """Returns (limited, retry_after_seconds)."""
-    now = time.time()
-    with _rate_lock:
-        timestamps = _rate_buckets.get(ip, [])
-        # Drop timestamps outside the window
-        timestamps = [t for t in timestamps if now - t < RATE_WINDOW]
-        if len(timestamps) >= RATE_LIMIT:
-            oldest = timestamps[0]
-            retry_after = int(RATE_WINDOW - (now - oldest)) + 1
-            _rate_buckets[ip] = timestamps
-            return True, retry_after
-        timestamps.append(now)
-        _rate_buckets[ip] = timestamps
-        return False, 0
+    return _limiter.check(ip)
 
 # ── Request handler ───────────────────────────────────────────────────────────
 
-class APIHandler(BaseHTTPRequestHandler):
+_NOT_FOUND_BODY = json.dumps({"error": "Not Found"}).encode()
+_TOO_MANY_BODY = json.dumps({"error": "Too Many Requests"}).encode()
+
+ROUTES = {}  # path -> function(handler)
+
+
+def route(path: str):
+    """Register a GET handler for an exact request path."""
+    def decorator(func):
+        ROUTES[path] = func
+        return func
+    return decorator
+
+
+@lru_cache(maxsize=8)
+def _healthz_body(version: str) -> bytes:
+    # Re-serialized only when the configured version changes.
+    return json.dumps({"status": "ok", "version": version}).encode()
+
+
+@route("/healthz")
+def healthz(handler):
+    handler.send_static(200, _healthz_body(load_version()))
+
+
+@route("/metrics")
+def metrics(handler):
+    handler.send_static(200, METRICS.render(), content_type=METRICS_CONTENT_TYPE, cache=False)
+
+
+METRICS = Metrics("api")
+METRICS.gauge("rate_limiter_keys", "IPs currently tracked by the rate limiter.", lambda: len(_limiter))
+METRICS.gauge("rate_limiter_memory_bytes", "Estimated rate limiter memory.", lambda: _limiter.memory_estimate())
+METRICS.gauge("rate_limiter_lock_wait_seconds_total", "Time spent waiting on limiter shard locks.",
+              lambda: _limiter.lock_wait_seconds, kind="counter")
+METRICS.gauge("config_reloads_total", "Times config.json has been (re)loaded.",
+              lambda: _version_cache.reloads, kind="counter")
+
+
+class APIHandler(RoutingMixin, BaseHTTPRequestHandler):
+
+    routes = ROUTES
+    metrics = METRICS
 
     def log_message(self, format, *args):
         pass  # suppress default access log
@@ -57,44 +213,59 @@ class APIHandler(BaseHTTPRequestHandler):
         return self.client_address[0]
 
     def send_json(self, status: int, body: dict, extra_headers: dict | None = None):
-        payload = json.dumps(body).encode()
-        self.send_response(status)
-        self.send_header("Content-Type", "application/json")
-        self.send_header("Content-Length", str(len(payload)))
-        if extra_headers:
-            for k, v in extra_headers.items():
-                self.send_header(k, str(v))
-        self.end_headers()
-        self.wfile.write(payload)
+        headers = tuple((k, str(v)) for k, v in extra_headers.items()) if extra_headers else ()
+        self.send_static(status, json.dumps(body).encode(), headers, cache=False)
 
     def check_rate_limit(self) -> bool:
         """Returns True if request should be blocked. Sends 429 response."""
         ip = self.get_client_ip()
         limited, retry_after = is_rate_limited(ip)
         if limited:
-            self.send_json(
-                429,
-                {"error": "Too Many Requests"},
-                {"Retry-After": retry_after},
-            )
+            self.send_static(429, _TOO_MANY_BODY, (("Retry-After", str(retry_after)),))
             return True
         return False
 
-    def do_GET(self):
-        if self.check_rate_limit():
-            return
-
-        if self.path == "/healthz":
-            self.send_json(200, {"status": "ok", "version": load_version()})
-        else:
-            self.send_json(404, {"error": "Not Found"})
+    def route_not_found(self):
+        self.send_static(404, _NOT_FOUND_BODY)
 
 
-def make_server(host: str = "127.0.0.1", port: int = 8080) -> HTTPServer:
-    return HTTPServer((host, port), APIHandler)
+def make_server(
+    host: str = "127.0.0.1",
+    port: int = 8080,
+    mode: str = "single",
+    workers: int = DEFAULT_WORKERS,
+    reuse_port: bool = False,
+) -> HTTPServer | AsyncHTTPServer:
+    """Build a server; mode is one of "single", "threaded" or "async"."""
+    return build_server(APIHandler, host, port, mode=mode, workers=workers, reuse_port=reuse_port)
 
 
 if __name__ == "__main__":
-    server = make_server()
-    print(f"Listening on http://127.0.0.1:8080")
-    server.serve_forever()
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--mode", choices=SERVER_MODES, default="single")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--processes", type=int, default=1,
+                        help="prefork this many processes sharing the port and rate limits; "
+                             "limits are a per-IP sliding window with one process and GCRA "
+                             "(same rate and burst, shared memory) with more, and /metrics "
+                             "samples then carry a pid label")
+    args = parser.parse_args()
+
+    if hasattr(signal, "SIGHUP"):
+        signal.signal(signal.SIGHUP, lambda signum, frame: _version_cache.invalidate())
+
+    print(f"Listening on http://127.0.0.1:{args.port} ({args.mode})")
+    if args.processes > 1:
+        from prefork import run_prefork
+        from shmlimiter import SharedMemoryLimiter
+
+        use_limiter(SharedMemoryLimiter(RATE_LIMIT, RATE_WINDOW))
+        METRICS.per_process = True
+        run_prefork(
+            lambda: make_server(port=args.port, mode=args.mode, workers=args.workers, reuse_port=True),
+            args.processes,
+        )
+    else:
+        server = make_server(port=args.port, mode=args.mode, workers=args.workers)
+        server.serve_forever()
@@ -3,17 +3,37 @@
 
 from __future__ import annotations
 
+import argparse
 import json
 import math
 import os
-import threading
+import signal
+import sys
 import time
 from collections import defaultdict, deque
+from functools import lru_cache
 from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Protocol
+
+from filecache import FileCache
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, Metrics, TimedLock
+from serving import DEFAULT_WORKERS, SERVER_MODES, AsyncHTTPServer, RoutingMixin, build_server
 
 CONFIG_FILE = os.path.join(os.path.dirname(__file__), "config.json")
 LIMIT_PER_MINUTE = 60
 WINDOW_SECONDS = 60
+_FLOAT_BYTES = sys.getsizeof(0.0)
+
+
+class LimiterBackend(Protocol):
+    """What Handler needs from a rate limiter; see also limitd.RemoteLimiter."""
+
+    def check(self, key: str) -> tuple[bool, int]: ...
+    def __len__(self) -> int: ...
+    def memory_estimate(self) -> int: ...
+
+    @property
+    def lock_wait_seconds(self) -> float: ...
 
 
 class SlidingWindowLimiter:
@@ -21,7 +41,7 @@ class SlidingWindowLimiter:
         self.limit = limit
         self.window_seconds = window_seconds
         self._hits: dict[str, deque[float]] = defaultdict(deque)
-        self._lock = threading.Lock()
+        self._lock = TimedLock()
 
     def check(self, key: str) -> tuple[bool, int]:
         now = time.time()
@@ -38,13 +58,87 @@ class SlidingWindowLimiter:
             window.append(now)
             return False, 0
 
+    def __len__(self) -> int:
+        return len(self._hits)
+
+    def memory_estimate(self) -> int:
+        with self._lock:
+            return sys.getsizeof(self._hits) + sum(
+                sys.getsizeof(key) + sys.getsizeof(window) + _FLOAT_BYTES * len(window)
+                for key, window in self._hits.items()
+            )
 
-_limiter = SlidingWindowLimiter(LIMIT_PER_MINUTE, WINDOW_SECONDS)
+    @property
+    def lock_wait_seconds(self) -> float:
+        return self._lock.wait_seconds
 
 
-def _version_from_config() -> str:
+class GCRALimiter:
+    """Generic cell rate algorithm: one theoretical-arrival timestamp per key.
+
+    Admits ``limit`` requests per ``window_seconds`` with the same burst size as
+    SlidingWindowLimiter, but memory is O(active keys) instead of
+    O(limit * active keys). Keys whose TAT has passed carry no state and are
+    pruned once the table doubles in size.
+    """
+
+    def __init__(self, limit: int, window_seconds: int) -> None:
+        self.limit = limit
+        self.window_seconds = window_seconds
+        # Integer nanoseconds: with float seconds, rounding in tat + interval
+        # can push the last request of a full burst just past the window.
+        self._window_ns = window_seconds * 1_000_000_000
+        self._interval_ns = self._window_ns // limit
+        self._tat: dict[str, int] = {}
+        self._prune_at = 1024
+        self._lock = TimedLock()
+
+    def check(self, key: str) -> tuple[bool, int]:
+        now = time.time_ns()
+        with self._lock:
+            tat = self._tat.get(key, now)
+            if tat < now:
+                tat = now
+            new_tat = tat + self._interval_ns
+            allow_at = new_tat - self._window_ns
+            if allow_at > now:
+                return True, max(1, -((now - allow_at) // 1_000_000_000))
+
+            self._tat[key] = new_tat
+            if len(self._tat) >= self._prune_at:
+                self._prune(now)
+            return False, 0
+
+    def _prune(self, now: int) -> None:
+        self._tat = {k: t for k, t in self._tat.items() if t > now}
+        self._prune_at = max(1024, 2 * len(self._tat))
+
+    def __len__(self) -> int:
+        return len(self._tat)
+
+    def memory_estimate(self) -> int:
+        with self._lock:
+            return sys.getsizeof(self._tat) + sum(
+                sys.getsizeof(key) + sys.getsizeof(tat) for key, tat in self._tat.items()
+            )
+
+    @property
+    def lock_wait_seconds(self) -> float:
+        return self._lock.wait_seconds
+
+
+_limiter: LimiterBackend = SlidingWindowLimiter(LIMIT_PER_MINUTE, WINDOW_SECONDS)
+
+
+def use_limiter(limiter: LimiterBackend) -> None:
+    global _limiter
+    _limiter = limiter
+    Handler.blocking_io = getattr(limiter, "blocking_io", False)
+
+
+def _read_version(path: str) -> str:
     try:
-        with open(CONFIG_FILE, "r", encoding="utf-8") as fh:
+        with open(path, "r", encoding="utf-8") as fh:
             data = json.load(fh)
     except (OSError, ValueError):
         return "unknown"
@@ -53,7 +147,46 @@ def _version_from_config() -> str:
     return version if isinstance(version, str) else "unknown"
 
 
-class Handler(BaseHTTPRequestHandler):
+_config_cache = FileCache(CONFIG_FILE, _read_version)
+
+
+def _version_from_config() -> str:
+    return _config_cache.get()
+
+
+_NOT_FOUND = json.dumps({"error": "Not Found"}).encode("utf-8")
+_TOO_MANY_REQUESTS = json.dumps({"error": "Too Many Requests"}).encode("utf-8")
+
+
+@lru_cache(maxsize=8)
+def _healthz_body(version: str) -> bytes:
+    return json.dumps({"status": "ok", "version": version}).encode("utf-8")
+
+
+def _healthz(handler: "Handler") -> None:
+    handler.send_static(200, _healthz_body(_version_from_config()))
+
+
+def _metrics(handler: "Handler") -> None:
+    handler.send_static(200, METRICS.render(), content_type=METRICS_CONTENT_TYPE, cache=False)
+
+
+METRICS = Metrics("api")
+METRICS.gauge("rate_limiter_keys", "Keys currently tracked by the rate limiter.", lambda: len(_limiter))
+METRICS.gauge("rate_limiter_memory_bytes", "Estimated rate limiter memory.", lambda: _limiter.memory_estimate())
+METRICS.gauge("rate_limiter_lock_wait_seconds_total", "Time spent waiting on the limiter lock.",
+              lambda: _limiter.lock_wait_seconds, kind="counter")
+METRICS.gauge("config_reloads_total", "Times config.json has been (re)loaded.",
+              lambda: _config_cache.reloads, kind="counter")
+
+
+class Handler(RoutingMixin, BaseHTTPRequestHandler):
+    routes = {
+        "/healthz": _healthz,
+        "/metrics": _metrics,
+    }
+    metrics = METRICS
+
     def log_message(self, format: str, *args) -> None:
         # Keep test output clean.
         return
@@ -65,34 +198,48 @@ class Handler(BaseHTTPRequestHandler):
         return self.client_address[0]
 
     def _write_json(self, status_code: int, payload: dict, headers: dict | None = None) -> None:
-        body = json.dumps(payload).encode("utf-8")
-        self.send_response(status_code)
-        self.send_header("Content-Type", "application/json")
-        self.send_header("Content-Length", str(len(body)))
-        if headers:
-            for name, value in headers.items():
-                self.send_header(name, str(value))
-        self.end_headers()
-        self.wfile.write(body)
-
-    def do_GET(self) -> None:
-        limited, retry_after = _limiter.check(self._client_ip())
-        if limited:
-            self._write_json(429, {"error": "Too Many Requests"}, {"Retry-After": retry_after})
-            return
+        extra = tuple((name, str(value)) for name, value in headers.items()) if headers else ()
+        self.send_static(status_code, json.dumps(payload).encode("utf-8"), extra, cache=False)
 
-        if self.path == "/healthz":
-            self._write_json(200, {"status": "ok", "version": _version_from_config()})
-            return
+    def route_not_found(self) -> None:
+        self.send_static(404, _NOT_FOUND)
 
-        self._write_json(404, {"error": "Not Found"})
+    def check_rate_limit(self) -> bool:
+        limited, retry_after = _limiter.check(self._client_ip())
+        if limited:
+            self.send_static(429, _TOO_MANY_REQUESTS, (("Retry-After", str(retry_after)),))
+        return limited
 
 
-def make_server(host: str = "127.0.0.1", port: int = 8080) -> HTTPServer:
-    return HTTPServer((host, port), Handler)
+def make_server(
+    host: str = "127.0.0.1",
+    port: int = 8080,
+    mode: str = "single",
+    workers: int = DEFAULT_WORKERS,
+    reuse_port: bool = False,
+) -> HTTPServer | AsyncHTTPServer:
+    return build_server(Handler, host, port, mode=mode, workers=workers, reuse_port=reuse_port)
 
 
 if __name__ == "__main__":
-    srv = make_server()
-    print("Listening on http://127.0.0.1:8080")
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--port", type=int, default=8080)
+    ap.add_argument("--mode", choices=SERVER_MODES, default="single")
+    ap.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    ap.add_argument("--limiter-daemon", metavar="HOST:PORT|PATH",
+                    help="share limits via limitd; falls back to local limits when unreachable")
+    opts = ap.parse_args()
+
+    if opts.limiter_daemon:
+        from limitd import RemoteLimiter
+
+        host, sep, port = opts.limiter_daemon.rpartition(":")
+        address = (host, int(port)) if sep else opts.limiter_daemon
+        use_limiter(RemoteLimiter(address, fallback=_limiter))
+
+    if hasattr(signal, "SIGHUP"):
+        signal.signal(signal.SIGHUP, lambda signum, frame: _config_cache.invalidate())
+
+    srv = make_server(port=opts.port, mode=opts.mode, workers=opts.workers)
+    print(f"Listening on http://127.0.0.1:{opts.port} ({opts.mode})")
     srv.serve_forever()
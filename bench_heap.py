@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Compare heap.MinHeap with the C-accelerated heapq module.
+
+Usage:
+  python3 bench_heap.py [--size 200000] [--seed 0]
+"""
+
+import argparse
+import heapq
+import json
+import random
+import time
+
+from heap import MinHeap
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return round((time.perf_counter() - start) * 1000, 1)
+
+
+def drain(heap: MinHeap) -> None:
+    pop = heap.pop
+    for _ in range(len(heap)):
+        pop()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--size", type=int, default=200_000, help="items per operation")
+    ap.add_argument("--seed", type=int, default=0)
+    opts = ap.parse_args()
+
+    rng = random.Random(opts.seed)
+    values = [rng.random() for _ in range(opts.size)]
+    pairs = [(v, i) for i, v in enumerate(values)]
+
+    def push_all() -> MinHeap:
+        heap = MinHeap()
+        for v in values:
+            heap.push(v)
+        return heap
+
+    def heapq_push_all() -> list:
+        heap: list = []
+        for v in values:
+            heapq.heappush(heap, v)
+        return heap
+
+    def heapq_drain() -> None:
+        heap = values[:]
+        heapq.heapify(heap)
+        for _ in range(len(heap)):
+            heapq.heappop(heap)
+
+    heap = MinHeap.from_iterable(values)
+    plain = values[:]
+    heapq.heapify(plain)
+    results = {
+        "size": opts.size,
+        "minheap": {
+            "push_n_ms": timed(push_all),
+            "from_iterable_ms": timed(lambda: MinHeap.from_iterable(values)),
+            "pop_all_ms": timed(lambda: drain(MinHeap.from_iterable(values))),  # includes heapify
+            "pushpop_n_ms": timed(lambda: [heap.pushpop(v) for v in values]),
+            "nsmallest_100_ms": timed(lambda: heap.nsmallest(100)),
+            "key_from_iterable_ms": timed(lambda: MinHeap.from_iterable(pairs, key=lambda p: p[0])),
+        },
+        "heapq": {
+            "push_n_ms": timed(heapq_push_all),
+            "heapify_ms": timed(lambda: heapq.heapify(values[:])),
+            "pop_all_ms": timed(heapq_drain),
+            "pushpop_n_ms": timed(lambda: [heapq.heappushpop(plain, v) for v in values]),
+            "nsmallest_100_ms": timed(lambda: heapq.nsmallest(100, plain)),
+            "key_heapify_ms": timed(lambda: heapq.heapify([(p[0], p) for p in pairs])),
+        },
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""Load generator for the api.py / api2.py HTTP servers.
+
+Starts a server in-process (default) or as a subprocess, drives it with
+concurrent keep-alive clients from a configurable set of client IPs (sent as
+X-Forwarded-For), and prints latency percentiles, throughput and the 429
+ratio as JSON.
+
+Usage:
+  python3 bench_http.py [--server api|api2] [--mode single|threaded|async]
+                        [--clients 50] [--duration 5] [--ips 1000]
+                        [--distribution uniform|zipf|single] [--subprocess]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+from serving import SERVER_MODES
+
+HOST = "127.0.0.1"
+
+
+def ip_picker(distribution: str, count: int, seed: int):
+    rng = random.Random(seed)
+    ips = [f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}" for i in range(count)]
+    if distribution == "single":
+        return lambda: ips[0]
+    if distribution == "uniform":
+        return lambda: rng.choice(ips)
+    # zipf-like: a few hot clients, a long tail of cold ones
+    weights = [1 / (rank + 1) for rank in range(count)]
+    cumulative = []
+    total = 0.0
+    for w in weights:
+        total += w
+        cumulative.append(total)
+    return lambda: rng.choices(ips, cum_weights=cumulative)[0]
+
+
+async def _read_response(reader: asyncio.StreamReader) -> tuple[int, bool]:
+    head = await reader.readuntil(b"\r\n\r\n")
+    status_line, *header_lines = head.decode("latin-1").split("\r\n")
+    version, status = status_line.split(" ", 2)[:2]
+    length = 0
+    keep_alive = version == "HTTP/1.1"
+    for line in header_lines:
+        name, _, value = line.partition(":")
+        name = name.strip().lower()
+        if name == "content-length":
+            length = int(value)
+        elif name == "connection" and value.strip().lower() == "close":
+            keep_alive = False
+    if length:
+        await reader.readexactly(length)
+    return int(status), keep_alive
+
+
+async def _client(port: int, path: str, pick_ip, deadline: float, latencies: list, statuses: dict, errors: list):
+    reader = writer = None
+    while time.perf_counter() < deadline:
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(HOST, port)
+            request = f"GET {path} HTTP/1.1\r\nHost: {HOST}\r\nX-Forwarded-For: {pick_ip()}\r\n\r\n"
+            start = time.perf_counter()
+            writer.write(request.encode())
+            status, keep_alive = await _read_response(reader)
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+            if not keep_alive:
+                writer.close()
+                reader = writer = None
+        except (OSError, asyncio.IncompleteReadError, ValueError) as exc:
+            errors.append(type(exc).__name__)
+            if writer is not None:
+                writer.close()
+            reader = writer = None
+            await asyncio.sleep(0.01)
+    if writer is not None:
+        writer.close()
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run_load(port: int, path: str, clients: int, duration: float, pick_ip) -> dict:
+    latencies: list[float] = []
+    statuses: dict[int, int] = {}
+    errors: list[str] = []
+
+    async def main():
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(*(
+            _client(port, path, pick_ip, deadline, latencies, statuses, errors) for _ in range(clients)
+        ))
+
+    start = time.perf_counter()
+    asyncio.run(main())
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    total = len(latencies)
+    return {
+        "requests": total,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(total / elapsed, 1) if elapsed else 0.0,
+        "latency_ms": {
+            name: round(percentile(latencies, pct) * 1000, 3)
+            for name, pct in (("p50", 50), ("p95", 95), ("p99", 99), ("max", 100))
+        },
+        "statuses": {str(k): v for k, v in sorted(statuses.items())},
+        "ratio_429": round(statuses.get(429, 0) / total, 4) if total else 0.0,
+        "errors": len(errors),
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind((HOST, 0))
+        return s.getsockname()[1]
+
+
+def _wait_for_port(port: int, timeout: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection((HOST, port), timeout=0.2).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"server did not start listening on port {port}")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--server", choices=("api", "api2"), default="api")
+    ap.add_argument("--mode", choices=SERVER_MODES, default="threaded")
+    ap.add_argument("--workers", type=int, default=32)
+    ap.add_argument("--path", default="/healthz")
+    ap.add_argument("--clients", type=int, default=50, help="concurrent keep-alive connections")
+    ap.add_argument("--duration", type=float, default=5.0, help="seconds of load")
+    ap.add_argument("--ips", type=int, default=1000, help="distinct client IPs")
+    ap.add_argument("--distribution", choices=("uniform", "zipf", "single"), default="uniform")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--subprocess", action="store_true", help="run the server in a separate process")
+    opts = ap.parse_args()
+
+    port = _free_port()
+    proc = server = None
+    if opts.subprocess:
+        script = os.path.join(os.path.dirname(os.path.abspath(__file__)), f"{opts.server}.py")
+        proc = subprocess.Popen(
+            [sys.executable, script, "--port", str(port), "--mode", opts.mode, "--workers", str(opts.workers)],
+            stdout=subprocess.DEVNULL,
+        )
+    else:
+        module = importlib.import_module(opts.server)
+        server = module.make_server(HOST, port, mode=opts.mode, workers=opts.workers)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    try:
+        _wait_for_port(port)
+        result = run_load(port, opts.path, opts.clients, opts.duration,
+                          ip_picker(opts.distribution, opts.ips, opts.seed))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
+    report = {
+        "server": opts.server,
+        "mode": opts.mode,
+        "in_process": not opts.subprocess,
+        "clients": opts.clients,
+        "distribution": opts.distribution,
+        "ips": opts.ips,
+        **result,
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
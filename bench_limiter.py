@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""Compare memory and check() latency of the api2 rate limiters.
+
+Usage:
+  python3 bench_limiter.py [--limit 10000] [--keys 100000] [--hits 20]
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+
+from api2 import GCRALimiter, SlidingWindowLimiter
+
+LIMITERS = {
+    "sliding_window": SlidingWindowLimiter,
+    "gcra": GCRALimiter,
+}
+
+
+def run(limiter, keys: list[str], hits: int) -> float:
+    start = time.perf_counter()
+    for _ in range(hits):
+        for key in keys:
+            limiter.check(key)
+    return time.perf_counter() - start
+
+
+def bench(cls, limit: int, keys: list[str], hits: int) -> dict:
+    # Time and memory are measured on separate runs: tracing skews latency.
+    elapsed = run(cls(limit, 60), keys, hits)
+
+    tracemalloc.start()
+    limiter = cls(limit, 60)
+    run(limiter, keys, hits)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    checks = hits * len(keys)
+    return {
+        "checks": checks,
+        "ns_per_check": round(elapsed / checks * 1e9, 1),
+        "memory_bytes": current,
+        "bytes_per_key": round(current / len(keys), 1),
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--limit", type=int, default=10_000, help="requests per minute per key")
+    ap.add_argument("--keys", type=int, default=100_000, help="distinct client keys")
+    ap.add_argument("--hits", type=int, default=20, help="checks per key")
+    opts = ap.parse_args()
+
+    keys = [f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}" for i in range(opts.keys)]
+    results = {name: bench(cls, opts.limit, keys, opts.hits) for name, cls in LIMITERS.items()}
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""Build and iterate costs for the linkedlist variants (and a plain list).
+
+Usage:
+  python3 bench_linkedlist.py [--size 1000000]
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+
+from linkedlist import DoublyLinkedList, LinkedList, UnrolledLinkedList
+
+
+def timed(fn) -> tuple[float, object]:
+    start = time.perf_counter()
+    result = fn()
+    return round((time.perf_counter() - start) * 1000, 1), result
+
+
+def build(cls, size: int):
+    container = cls()
+    append = container.append
+    for i in range(size):
+        append(i)
+    return container
+
+
+def measure(cls, size: int) -> dict:
+    build_ms, container = timed(lambda: build(cls, size))
+    iterate_ms, _ = timed(lambda: sum(1 for _ in container))
+    del container
+    tracemalloc.start()
+    container = build(cls, size)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return {
+        "build_ms": build_ms,
+        "iterate_ms": iterate_ms,
+        "bytes_per_value": round(memory / size, 1),
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--size", type=int, default=1_000_000)
+    opts = ap.parse_args()
+
+    results = {"size": opts.size}
+    for name, cls in (
+        ("LinkedList", LinkedList),
+        ("DoublyLinkedList", DoublyLinkedList),
+        ("UnrolledLinkedList", UnrolledLinkedList),
+        ("list", list),
+    ):
+        results[name] = measure(cls, opts.size)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
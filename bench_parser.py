@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Compare the recursive-descent and Pratt engines of parser.parse_expr.
+
+Usage:
+  python3 bench_parser.py [--terms 1000,10000,100000] [--depth 100000]
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from parser import parse_expr
+
+
+def long_expr(terms: int) -> str:
+    ops = [" + ", " * ", " - ", " / "]
+    parts = ["1"]
+    for i in range(1, terms):
+        parts.append(ops[i % 4])
+        parts.append(str(i % 9 + 1))
+    return "".join(parts)
+
+
+def time_engine(expr: str, engine: str) -> float | str:
+    start = time.perf_counter()
+    try:
+        parse_expr(expr, engine=engine)
+    except RecursionError:
+        return "RecursionError"
+    return round((time.perf_counter() - start) * 1000, 3)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--terms", default="1000,10000,100000", help="comma-separated operand counts")
+    ap.add_argument("--depth", type=int, default=100_000, help="parenthesis nesting depth")
+    opts = ap.parse_args()
+
+    results = {"long_ms": {}, "nested_ms": {}, "recursion_limit": sys.getrecursionlimit()}
+    for terms in (int(t) for t in opts.terms.split(",")):
+        expr = long_expr(terms)
+        descent = time_engine(expr, "descent")
+        pratt = time_engine(expr, "pratt")
+        results["long_ms"][terms] = {
+            "descent": descent,
+            "pratt": pratt,
+            "speedup": round(descent / pratt, 2) if isinstance(descent, float) else None,
+        }
+
+    nested = "(" * opts.depth + "1" + ")" * opts.depth
+    results["nested_ms"][opts.depth] = {
+        "descent": time_engine(nested, "descent"),
+        "pratt": time_engine(nested, "pratt"),
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
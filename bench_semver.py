@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Time parsing, sorting and max-finding over a synthetic package index.
+
+Usage:
+  python3 bench_semver.py [--count 1000000] [--distinct 50000] [--seed 0]
+"""
+
+import argparse
+import json
+import random
+import time
+import tracemalloc
+
+from semver import SemVer, max_version, parse_many, sort_versions
+
+_PRERELEASES = ["", "", "", "-alpha", "-alpha.1", "-beta.2", "-beta.11", "-rc.1", "-rc.1.dev-3"]
+
+
+def make_index(count: int, distinct: int, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    pool = [
+        f"{rng.randrange(20)}.{rng.randrange(50)}.{rng.randrange(100)}{rng.choice(_PRERELEASES)}"
+        for _ in range(distinct)
+    ]
+    return [rng.choice(pool) for _ in range(count)]
+
+
+def timed(fn) -> tuple[float, object]:
+    start = time.perf_counter()
+    result = fn()
+    return round((time.perf_counter() - start) * 1000, 1), result
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--count", type=int, default=1_000_000, help="versions in the index")
+    ap.add_argument("--distinct", type=int, default=50_000, help="distinct version strings")
+    ap.add_argument("--seed", type=int, default=0)
+    opts = ap.parse_args()
+
+    index = make_index(opts.count, opts.distinct, opts.seed)
+
+    tracemalloc.start()
+    parse_ms, parsed = timed(lambda: [SemVer(v) for v in index])
+    parsed_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    parse_many_ms, _ = timed(lambda: parse_many(index))
+    sort_objects_ms, _ = timed(lambda: sorted(parsed))
+    sort_parsed_ms, _ = timed(lambda: sort_versions(parsed))
+    sort_strings_ms, _ = timed(lambda: sort_versions(index))
+    max_ms, _ = timed(lambda: max_version(index))
+
+    print(json.dumps({
+        "count": opts.count,
+        "distinct": len(set(index)),
+        "parse_ms": parse_ms,
+        "parsed_bytes_per_version": round(parsed_bytes / opts.count, 1),
+        "parse_many_ms": parse_many_ms,
+        "sorted_objects_ms": sort_objects_ms,
+        "sort_versions_objects_ms": sort_parsed_ms,
+        "sort_versions_strings_ms": sort_strings_ms,
+        "max_version_ms": max_ms,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
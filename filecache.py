@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""Change-aware cache for values derived from a small file (e.g. config.json)."""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Callable, Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class FileCache(Generic[T]):
+    """Caches ``loader(path)`` and reruns it only when the file changes.
+
+    A change is any difference in (inode, mtime, size), including the file
+    appearing or disappearing. The file is stat'ed at most once per
+    ``check_interval`` seconds; ``invalidate()`` forces a reload on the next
+    ``get()`` and is safe to call from a signal handler. ``reloads`` counts
+    how many times the loader has run.
+    """
+
+    def __init__(self, path: str, loader: Callable[[str], T], check_interval: float = 1.0) -> None:
+        self.path = path
+        self.check_interval = check_interval
+        self.reloads = 0
+        self._loader = loader
+        self._lock = threading.Lock()
+        self._signature: tuple[int, int, int] | None = None
+        self._value: T | None = None
+        self._loaded = False
+        self._next_check = 0.0
+        self._stale = True
+
+    def _stat(self) -> tuple[int, int, int] | None:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def get(self) -> T:
+        now = time.monotonic()
+        if not self._stale and now < self._next_check:
+            return self._value
+        with self._lock:
+            signature = self._stat()
+            if self._stale or not self._loaded or signature != self._signature:
+                self._stale = False
+                self._value = self._loader(self.path)
+                self._signature = signature
+                self._loaded = True
+                self.reloads += 1
+            self._next_check = now + self.check_interval
+            return self._value
+
+    def invalidate(self) -> None:
+        """Force the next get() to rerun the loader."""
+        self._stale = True
+
+    def reload(self) -> T:
+        self.invalidate()
+        return self.get()
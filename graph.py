@@ -1,15 +1,27 @@
 #!/usr/bin/env python3
 
+import heapq
+import math
+from array import array
 from collections import defaultdict, deque
 
 
 class Graph:
     def __init__(self):
         self.adj = defaultdict(set)
+        # Only edges whose weight differs from 1 are stored, keyed both ways.
+        self.weights = {}
 
-    def add_edge(self, u, v):
+    def add_edge(self, u, v, weight=1):
+        if weight < 0:
+            raise ValueError("edge weight must be non-negative")
         self.adj[u].add(v)
         self.adj[v].add(u)
+        if weight == 1:
+            self.weights.pop((u, v), None)
+            self.weights.pop((v, u), None)
+        else:
+            self.weights[(u, v)] = self.weights[(v, u)] = weight
 
     def bfs(self, start) -> list:
         if start not in self.adj:
@@ -33,15 +45,247 @@ class Graph:
         if start not in self.adj:
             return [start]
 
-        visited = set()
-        order = []
-
-        def walk(node):
-            visited.add(node)
-            order.append(node)
-            for neighbor in sorted(self.adj[node]):
+        visited = {start}
+        order = [start]
+        # Explicit stack of neighbour iterators: same preorder as a recursive
+        # walk, without the recursion limit.
+        stack = [iter(sorted(self.adj[start]))]
+        while stack:
+            for neighbor in stack[-1]:
                 if neighbor not in visited:
-                    walk(neighbor)
+                    visited.add(neighbor)
+                    order.append(neighbor)
+                    stack.append(iter(sorted(self.adj[neighbor])))
+                    break
+            else:
+                stack.pop()
 
-        walk(start)
         return order
+
+    def bfs_distances(self, start) -> dict:
+        """Hop count from ``start`` to every reachable node."""
+        return self.multi_source_bfs([start])
+
+    def multi_source_bfs(self, sources) -> dict:
+        """Hop count from the nearest of ``sources`` to every reachable node."""
+        adj = self.adj
+        dist = dict.fromkeys(sources, 0)
+        frontier = list(dist)
+        depth = 0
+        while frontier:
+            depth += 1
+            next_frontier = []
+            for node in frontier:
+                for neighbor in adj.get(node, ()):
+                    if neighbor not in dist:
+                        dist[neighbor] = depth
+                        next_frontier.append(neighbor)
+            frontier = next_frontier
+        return dist
+
+    def shortest_path(self, source, target):
+        """Fewest-hop path from ``source`` to ``target`` as a node list, or None.
+
+        Bidirectional BFS: the smaller frontier is expanded one level at a
+        time, so only about the square root of a one-sided search's nodes
+        are visited on typical graphs.
+        """
+        if source == target:
+            return [source]
+        adj = self.adj
+        if source not in adj or target not in adj:
+            return None
+
+        parents = ({source: None}, {target: None})
+        dists = ({source: 0}, {target: 0})
+        frontiers = ([source], [target])
+        while frontiers[0] and frontiers[1]:
+            side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+            parent, dist = parents[side], dists[side]
+            other_dist = dists[1 - side]
+            best = meet = None
+            next_frontier = []
+            for node in frontiers[side]:
+                depth = dist[node] + 1
+                for neighbor in adj[node]:
+                    if neighbor in dist:
+                        continue
+                    parent[neighbor] = node
+                    dist[neighbor] = depth
+                    next_frontier.append(neighbor)
+                    if neighbor in other_dist:
+                        total = depth + other_dist[neighbor]
+                        if best is None or total < best:
+                            best, meet = total, neighbor
+            if meet is not None:
+                return self._join_paths(parents, meet)
+            frontiers = (next_frontier, frontiers[1]) if side == 0 else (frontiers[0], next_frontier)
+        return None
+
+    @staticmethod
+    def _join_paths(parents, meet) -> list:
+        path = []
+        node = meet
+        while node is not None:
+            path.append(node)
+            node = parents[0][node]
+        path.reverse()
+        node = parents[1][meet]
+        while node is not None:
+            path.append(node)
+            node = parents[1][node]
+        return path
+
+    def dijkstra(self, source, target=None) -> dict:
+        """Weighted distance from ``source`` to every reachable node.
+
+        With ``target``, the search stops as soon as that node is settled,
+        so the result covers only the nodes settled up to that point.
+        """
+        dist, _ = self._dijkstra(source, target)
+        return dist
+
+    def weighted_path(self, source, target):
+        """Return ``(cost, path)`` for the cheapest path, or None if unreachable."""
+        dist, prev = self._dijkstra(source, target)
+        if target not in dist:
+            return None
+        path = []
+        node = target
+        while node is not None:
+            path.append(node)
+            node = prev[node]
+        path.reverse()
+        return dist[target], path
+
+    def _dijkstra(self, source, target):
+        adj = self.adj
+        weights = self.weights
+        dist = {}
+        best = {source: 0}
+        prev = {source: None}
+        # Lazy deletion: stale entries are skipped when popped. The counter
+        # breaks ties so nodes themselves are never compared.
+        queue = [(0, 0, source)]
+        counter = 1
+        while queue:
+            d, _, node = heapq.heappop(queue)
+            if node in dist:
+                continue
+            dist[node] = d
+            if node == target:
+                break
+            for neighbor in adj.get(node, ()):
+                if neighbor in dist:
+                    continue
+                nd = d + weights.get((node, neighbor), 1)
+                if nd < best.get(neighbor, math.inf):
+                    best[neighbor] = nd
+                    prev[neighbor] = node
+                    heapq.heappush(queue, (nd, counter, neighbor))
+                    counter += 1
+        return dist, prev
+
+    def freeze(self) -> "FrozenGraph":
+        """Return an immutable, compact snapshot of this graph (see FrozenGraph)."""
+        return FrozenGraph(self.adj)
+
+
+def _array_for(max_value: int) -> array:
+    return array("I" if max_value < 1 << 32 else "Q")
+
+
+class FrozenGraph:
+    """Immutable graph in compressed sparse row (CSR) form.
+
+    Node IDs are assigned in insertion order, so nodes need not be mutually
+    comparable. The neighbours of node ``i`` are
+    ``targets[offsets[i]:offsets[i + 1]]``, stored in the ``sorted()`` order
+    of their values that Graph's traversals use, so bfs()/dfs() return
+    exactly what Graph's would. ``nodes[i]`` maps an ID back to its node and
+    ``ids`` maps a node to its ID.
+    """
+
+    __slots__ = ("nodes", "ids", "offsets", "targets")
+
+    def __init__(self, adj) -> None:
+        self.nodes = list(adj)
+        self.ids = {node: i for i, node in enumerate(self.nodes)}
+        ids = self.ids
+        self.offsets = _array_for(sum(len(neighbors) for neighbors in adj.values()))
+        self.targets = _array_for(len(self.nodes))
+        self.offsets.append(0)
+        for node in self.nodes:
+            self.targets.extend(ids[neighbor] for neighbor in sorted(adj[node]))
+            self.offsets.append(len(self.targets))
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def __contains__(self, node) -> bool:
+        return node in self.ids
+
+    @property
+    def edge_count(self) -> int:
+        """Number of undirected edges (a self-loop counts once)."""
+        loops = sum(
+            1 for i in range(len(self.nodes))
+            if i in self.targets[self.offsets[i]:self.offsets[i + 1]]
+        )
+        return (len(self.targets) + loops) // 2
+
+    def neighbors(self, node) -> list:
+        i = self.ids[node]
+        nodes = self.nodes
+        return [nodes[j] for j in self.targets[self.offsets[i]:self.offsets[i + 1]]]
+
+    def bfs(self, start) -> list:
+        if start not in self.ids:
+            return [start]
+
+        offsets, targets = self.offsets, self.targets
+        source = self.ids[start]
+        visited = bytearray(len(self.nodes))
+        visited[source] = 1
+        order = [source]
+        # The order list doubles as the FIFO queue.
+        head = 0
+        while head < len(order):
+            i = order[head]
+            head += 1
+            for j in targets[offsets[i]:offsets[i + 1]]:
+                if not visited[j]:
+                    visited[j] = 1
+                    order.append(j)
+
+        nodes = self.nodes
+        return [nodes[i] for i in order]
+
+    def dfs(self, start) -> list:
+        if start not in self.ids:
+            return [start]
+
+        offsets, targets = self.offsets, self.targets
+        source = self.ids[start]
+        visited = bytearray(len(self.nodes))
+        visited[source] = 1
+        order = [source]
+        # Explicit stack of (node, next neighbour offset): same preorder as
+        # the recursive walk, without the recursion limit.
+        stack = [(source, offsets[source])]
+        while stack:
+            i, k = stack[-1]
+            end = offsets[i + 1]
+            while k < end and visited[targets[k]]:
+                k += 1
+            if k == end:
+                stack.pop()
+                continue
+            stack[-1] = (i, k + 1)
+            j = targets[k]
+            visited[j] = 1
+            order.append(j)
+            stack.append((j, offsets[j]))
+
+        nodes = self.nodes
+        return [nodes[i] for i in order]
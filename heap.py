@@ -2,11 +2,37 @@
 
 
 class MinHeap:
-    def __init__(self):
+    """Array-backed binary min-heap.
+
+    With ``key``, items are ordered by ``key(item)``, computed once on
+    insertion and kept in a parallel list, so items themselves never need
+    to be comparable. Sifts move a hole instead of swapping, writing each
+    displaced entry once.
+    """
+
+    def __init__(self, key=None):
         self._data = []
+        self._key = key
+        self._keys = [] if key is not None else None
+
+    @classmethod
+    def from_iterable(cls, iterable, key=None):
+        """Build a heap from ``iterable`` in O(n) (bottom-up heapify)."""
+        heap = cls(key=key)
+        heap._data = list(iterable)
+        if key is not None:
+            heap._keys = [key(item) for item in heap._data]
+        for i in reversed(range(len(heap._data) // 2)):
+            heap._sift_down(i)
+        return heap
+
+    def __len__(self):
+        return len(self._data)
 
     def push(self, val):
         self._data.append(val)
+        if self._keys is not None:
+            self._keys.append(self._key(val))
         self._sift_up(len(self._data) - 1)
 
     def pop(self):
@@ -15,8 +41,12 @@ class MinHeap:
 
         smallest = self._data[0]
         last = self._data.pop()
+        if self._keys is not None:
+            last_key = self._keys.pop()
         if self._data:
             self._data[0] = last
+            if self._keys is not None:
+                self._keys[0] = last_key
             self._sift_down(0)
         return smallest
 
@@ -25,29 +55,279 @@ class MinHeap:
             raise IndexError("peek from empty heap")
         return self._data[0]
 
+    def pushpop(self, val):
+        """Push ``val`` then pop the smallest item, faster than the two calls."""
+        if self._keys is None:
+            if not self._data or not self._data[0] < val:
+                return val
+            smallest, self._data[0] = self._data[0], val
+        else:
+            k = self._key(val)
+            if not self._data or not self._keys[0] < k:
+                return val
+            smallest, self._data[0] = self._data[0], val
+            self._keys[0] = k
+        self._sift_down(0)
+        return smallest
+
+    def replace(self, val):
+        """Pop the smallest item then push ``val`` (the heap must not be empty)."""
+        if not self._data:
+            raise IndexError("replace on empty heap")
+        smallest, self._data[0] = self._data[0], val
+        if self._keys is not None:
+            self._keys[0] = self._key(val)
+        self._sift_down(0)
+        return smallest
+
+    def nsmallest(self, n):
+        """Return the ``n`` smallest items in order, without modifying the heap.
+
+        Walks the heap from the root, so it costs O(n log n) regardless of
+        the heap's size.
+        """
+        keys = self._keys if self._keys is not None else self._data
+        size = len(keys)
+        result = []
+        if n <= 0 or not size:
+            return result
+        frontier = MinHeap(key=keys.__getitem__)
+        frontier.push(0)
+        while frontier._data and len(result) < n:
+            i = frontier.pop()
+            result.append(self._data[i])
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < size:
+                    frontier.push(child)
+        return result
+
     def _sift_up(self, i):
-        while i > 0:
-            parent = (i - 1) // 2
-            if self._data[i] < self._data[parent]:
-                self._data[i], self._data[parent] = self._data[parent], self._data[i]
+        data = self._data
+        item = data[i]
+        keys = self._keys
+        if keys is None:
+            while i > 0:
+                parent = (i - 1) >> 1
+                parent_item = data[parent]
+                if not item < parent_item:
+                    break
+                data[i] = parent_item
                 i = parent
-            else:
+            data[i] = item
+            return
+
+        k = keys[i]
+        while i > 0:
+            parent = (i - 1) >> 1
+            parent_key = keys[parent]
+            if not k < parent_key:
                 break
+            keys[i] = parent_key
+            data[i] = data[parent]
+            i = parent
+        keys[i] = k
+        data[i] = item
 
     def _sift_down(self, i):
-        n = len(self._data)
+        data = self._data
+        n = len(data)
+        item = data[i]
+        keys = self._keys
+        if keys is None:
+            while True:
+                child = 2 * i + 1
+                if child >= n:
+                    break
+                right = child + 1
+                if right < n and data[right] < data[child]:
+                    child = right
+                if not data[child] < item:
+                    break
+                data[i] = data[child]
+                i = child
+            data[i] = item
+            return
+
+        k = keys[i]
         while True:
-            left = 2 * i + 1
-            right = 2 * i + 2
-            smallest = i
+            child = 2 * i + 1
+            if child >= n:
+                break
+            right = child + 1
+            if right < n and keys[right] < keys[child]:
+                child = right
+            if not keys[child] < k:
+                break
+            keys[i] = keys[child]
+            data[i] = data[child]
+            i = child
+        keys[i] = k
+        data[i] = item
+
+
+def heapify(iterable, key=None):
+    """Shorthand for ``MinHeap.from_iterable(iterable, key)``."""
+    return MinHeap.from_iterable(iterable, key=key)
+
+
+class IndexedMinHeap:
+    """Min-heap of unique, hashable handles with mutable priorities.
+
+    A handle -> position map is kept in step with every move, so
+    ``update_priority`` and ``remove`` find their entry in O(1) and re-sift
+    in O(log n). Handles and priorities live in two flat lists plus the
+    map, with no per-entry wrapper objects.
+
+    Not a ``MinHeap``: ``push``, ``pushpop`` and ``replace`` take a
+    ``(handle, priority)`` pair rather than a single item.
+    """
+
+    def __init__(self):
+        self._data = []
+        self._keys = []
+        self._pos = {}
+
+    @classmethod
+    def from_iterable(cls, pairs):
+        """Build from ``(handle, priority)`` pairs in O(n)."""
+        heap = cls()
+        for handle, priority in pairs:
+            if handle in heap._pos:
+                raise ValueError(f"{handle!r} is already queued")
+            heap._pos[handle] = len(heap._data)
+            heap._data.append(handle)
+            heap._keys.append(priority)
+        for i in reversed(range(len(heap._data) // 2)):
+            heap._sift_down(i)
+        return heap
+
+    def __len__(self):
+        return len(self._data)
 
-            if left < n and self._data[left] < self._data[smallest]:
-                smallest = left
-            if right < n and self._data[right] < self._data[smallest]:
-                smallest = right
+    def __contains__(self, handle):
+        return handle in self._pos
 
-            if smallest == i:
+    def contains(self, handle):
+        return handle in self._pos
+
+    def priority(self, handle):
+        return self._keys[self._pos[handle]]
+
+    def push(self, handle, priority):
+        if handle in self._pos:
+            raise ValueError(f"{handle!r} is already queued")
+        self._pos[handle] = len(self._data)
+        self._data.append(handle)
+        self._keys.append(priority)
+        self._sift_up(len(self._data) - 1)
+
+    def pop(self):
+        if not self._data:
+            raise IndexError("pop from empty heap")
+        handle = self._data[0]
+        self._remove_at(0)
+        return handle
+
+    def peek(self):
+        if not self._data:
+            raise IndexError("peek from empty heap")
+        return self._data[0]
+
+    def pushpop(self, handle, priority):
+        if handle in self._pos:
+            raise ValueError(f"{handle!r} is already queued")
+        if not self._data or not self._keys[0] < priority:
+            return handle
+        smallest = self._data[0]
+        del self._pos[smallest]
+        self._data[0] = handle
+        self._keys[0] = priority
+        self._pos[handle] = 0
+        self._sift_down(0)
+        return smallest
+
+    def replace(self, handle, priority):
+        if not self._data:
+            raise IndexError("replace on empty heap")
+        smallest = self._data[0]
+        if handle in self._pos and handle != smallest:
+            raise ValueError(f"{handle!r} is already queued")
+        del self._pos[smallest]
+        self._data[0] = handle
+        self._keys[0] = priority
+        self._pos[handle] = 0
+        self._sift_down(0)
+        return smallest
+
+    def update_priority(self, handle, priority):
+        """Change a queued handle's priority; KeyError if it is not queued."""
+        i = self._pos[handle]
+        old = self._keys[i]
+        self._keys[i] = priority
+        if priority < old:
+            self._sift_up(i)
+        else:
+            self._sift_down(i)
+
+    def remove(self, handle):
+        """Remove a queued handle and return its priority; KeyError if absent."""
+        i = self._pos[handle]
+        priority = self._keys[i]
+        self._remove_at(i)
+        return priority
+
+    def _remove_at(self, i):
+        data, keys = self._data, self._keys
+        del self._pos[data[i]]
+        last = data.pop()
+        last_key = keys.pop()
+        if i == len(data):
+            return
+        data[i] = last
+        keys[i] = last_key
+        self._pos[last] = i
+        if i > 0 and last_key < keys[(i - 1) >> 1]:
+            self._sift_up(i)
+        else:
+            self._sift_down(i)
+
+    def _sift_up(self, i):
+        data, keys, pos = self._data, self._keys, self._pos
+        item = data[i]
+        k = keys[i]
+        while i > 0:
+            parent = (i - 1) >> 1
+            parent_key = keys[parent]
+            if not k < parent_key:
                 break
+            moved = data[parent]
+            keys[i] = parent_key
+            data[i] = moved
+            pos[moved] = i
+            i = parent
+        keys[i] = k
+        data[i] = item
+        pos[item] = i
 
-            self._data[i], self._data[smallest] = self._data[smallest], self._data[i]
-            i = smallest
+    def _sift_down(self, i):
+        data, keys, pos = self._data, self._keys, self._pos
+        n = len(data)
+        item = data[i]
+        k = keys[i]
+        while True:
+            child = 2 * i + 1
+            if child >= n:
+                break
+            right = child + 1
+            if right < n and keys[right] < keys[child]:
+                child = right
+            if not keys[child] < k:
+                break
+            moved = data[child]
+            keys[i] = keys[child]
+            data[i] = moved
+            pos[moved] = i
+            i = child
+        keys[i] = k
+        data[i] = item
+        pos[item] = i
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""Standalone rate-limit daemon and its pooled client.
+
+Several api2 nodes behind a load balancer can share one limit by pointing
+their RemoteLimiter at a single limitd. The wire protocol is line based and
+pipelinable; responses come back in request order:
+
+    C <key>\\n      ->   <limited 0|1> <retry_after>\\n
+
+Keys are percent-quoted by the client so they never contain whitespace. A
+connection that sends a line longer than MAX_LINE_BYTES is dropped.
+
+Usage:
+  python3 limitd.py [--host 127.0.0.1] [--port 7070 | --unix PATH] [--limit 60] [--window 60]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import queue
+import socket
+import threading
+import time
+from urllib.parse import quote
+
+from api2 import GCRALimiter, LIMIT_PER_MINUTE, WINDOW_SECONDS, SlidingWindowLimiter
+
+DEFAULT_PORT = 7070
+READ_CHUNK = 64 * 1024
+MAX_LINE_BYTES = 4096
+
+
+class LimiterDaemon:
+    """asyncio server answering pipelined checks against one local limiter.
+
+    ``address`` is a (host, port) tuple for TCP or a filesystem path for a
+    UNIX socket. All complete lines in each read are answered with a single
+    write, so a pipelined batch costs one round trip.
+    """
+
+    def __init__(self, address, limiter) -> None:
+        self.address = address
+        self.limiter = limiter
+        self.server_address = address
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._stop: asyncio.Event | None = None
+        self._ready = threading.Event()
+
+    def serve_forever(self) -> None:
+        asyncio.run(self._serve())
+
+    async def _serve(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        if isinstance(self.address, str):
+            server = await asyncio.start_unix_server(self._handle, path=self.address)
+        else:
+            server = await asyncio.start_server(self._handle, *self.address)
+            self.server_address = server.sockets[0].getsockname()[:2]
+        self._ready.set()
+        async with server:
+            await self._stop.wait()
+
+    def wait_ready(self, timeout: float = 5.0) -> bool:
+        return self._ready.wait(timeout)
+
+    def shutdown(self) -> None:
+        if self._loop is not None and self._stop is not None:
+            self._loop.call_soon_threadsafe(self._stop.set)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        check = self.limiter.check
+        pending = b""
+        try:
+            while True:
+                chunk = await reader.read(READ_CHUNK)
+                if not chunk:
+                    break
+                *lines, pending = (pending + chunk).split(b"\n")
+                out = []
+                for line in lines:
+                    if not line.startswith(b"C "):
+                        out.append(b"E bad-request\n")
+                        continue
+                    limited, retry_after = check(line[2:].decode("ascii", "replace"))
+                    out.append(b"1 %d\n" % retry_after if limited else b"0 0\n")
+                if out:
+                    writer.write(b"".join(out))
+                    await writer.drain()
+                if len(pending) > MAX_LINE_BYTES:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+class _PendingCheck:
+    __slots__ = ("key", "sent", "result", "error")
+
+    def __init__(self, key: str) -> None:
+        self.key = key
+        self.sent = False
+        self.result: tuple[bool, int] | None = None
+        self.error: BaseException | None = None
+
+
+class RemoteLimiter:
+    """Limiter backend that consults a LimiterDaemon over pooled connections.
+
+    At most ``pool_size`` round trips are in flight. Checks arriving while
+    every connection is busy queue up, and the next free caller sends all
+    of them as one pipelined batch, so round trips stay bounded as
+    concurrency grows.
+
+    If the daemon cannot be reached (connect/IO error or ``timeout``), the
+    check is answered by ``fallback`` instead and the daemon is not retried
+    for ``retry_interval`` seconds, so an outage degrades to per-node limits
+    rather than failing requests.
+    """
+
+    # Checks wait on the network, so async servers run them off the loop.
+    blocking_io = True
+
+    def __init__(
+        self,
+        address,
+        fallback,
+        pool_size: int = 8,
+        timeout: float = 0.25,
+        retry_interval: float = 5.0,
+    ) -> None:
+        if pool_size < 1:
+            raise ValueError("pool_size must be at least 1")
+        self.address = address
+        self.fallback = fallback
+        self.timeout = timeout
+        self.retry_interval = retry_interval
+        self.remote_errors = 0
+        self._pool: queue.LifoQueue = queue.LifoQueue(maxsize=pool_size)
+        self._down_until = 0.0
+        self._batch_cond = threading.Condition()
+        self._queued: list[_PendingCheck] = []
+        self._in_flight = 0
+
+    def _connect(self):
+        if isinstance(self.address, str):
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.address)
+        else:
+            sock = socket.create_connection(self.address, timeout=self.timeout)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return sock, sock.makefile("rb")
+
+    def _request(self, keys: list[str]) -> list[tuple[bool, int]]:
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        sock, rfile = conn
+        try:
+            sock.sendall(b"".join(b"C %s\n" % quote(key, safe="").encode("ascii") for key in keys))
+            results = []
+            for _ in keys:
+                line = rfile.readline()
+                if not line.endswith(b"\n"):
+                    raise ConnectionError("limiter daemon closed the connection")
+                flag, _, retry = line.partition(b" ")
+                if flag not in (b"0", b"1"):
+                    raise ConnectionError(f"unexpected limiter reply: {line!r}")
+                results.append((flag == b"1", int(retry)))
+        except BaseException:
+            rfile.close()
+            sock.close()
+            raise
+        try:
+            self._pool.put_nowait(conn)
+        except queue.Full:
+            rfile.close()
+            sock.close()
+        return results
+
+    def check_many(self, keys: list[str]) -> list[tuple[bool, int]]:
+        """Check several keys in one pipelined round trip."""
+        if not keys:
+            return []
+        if time.monotonic() >= self._down_until:
+            try:
+                return self._request(keys)
+            except (OSError, ValueError):
+                self.remote_errors += 1
+                self._down_until = time.monotonic() + self.retry_interval
+        return [self.fallback.check(key) for key in keys]
+
+    def check(self, key: str) -> tuple[bool, int]:
+        item = _PendingCheck(key)
+        with self._batch_cond:
+            self._queued.append(item)
+            while item.sent or self._in_flight >= self._pool.maxsize:
+                if item.error is not None:
+                    raise item.error
+                if item.result is not None:
+                    return item.result
+                self._batch_cond.wait()
+            batch, self._queued = self._queued, []
+            for pending in batch:
+                pending.sent = True
+            self._in_flight += 1
+        try:
+            results = self.check_many([pending.key for pending in batch])
+        except BaseException as exc:
+            for pending in batch:
+                pending.error = exc
+            raise
+        else:
+            for pending, result in zip(batch, results):
+                pending.result = result
+        finally:
+            with self._batch_cond:
+                self._in_flight -= 1
+                self._batch_cond.notify_all()
+        return item.result
+
+    def close(self) -> None:
+        while True:
+            try:
+                sock, rfile = self._pool.get_nowait()
+            except queue.Empty:
+                return
+            rfile.close()
+            sock.close()
+
+    def __len__(self) -> int:
+        return len(self.fallback)
+
+    def memory_estimate(self) -> int:
+        return self.fallback.memory_estimate()
+
+    @property
+    def lock_wait_seconds(self) -> float:
+        return self.fallback.lock_wait_seconds
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=DEFAULT_PORT)
+    ap.add_argument("--unix", metavar="PATH", help="listen on a UNIX socket instead of TCP")
+    ap.add_argument("--limit", type=int, default=LIMIT_PER_MINUTE)
+    ap.add_argument("--window", type=int, default=WINDOW_SECONDS)
+    ap.add_argument("--algorithm", choices=("sliding", "gcra"), default="gcra")
+    opts = ap.parse_args()
+
+    limiter_cls = GCRALimiter if opts.algorithm == "gcra" else SlidingWindowLimiter
+    address = opts.unix or (opts.host, opts.port)
+    daemon = LimiterDaemon(address, limiter_cls(opts.limit, opts.window))
+    print(f"limitd listening on {address} ({opts.algorithm}, {opts.limit}/{opts.window}s)")
+    daemon.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,42 @@
 #!/usr/bin/env python3
 
+from itertools import chain
+
+UNROLLED_CHUNK_SIZE = 64
+
 
 class Node:
+    __slots__ = ("value", "next")
+
     def __init__(self, value, next_node=None):
         self.value = value
         self.next = next_node
 
 
 class LinkedList:
-    def __init__(self):
+    """Singly linked list with O(1) append via a tracked tail and size."""
+
+    def __init__(self, values=()):
         self.head = None
+        self._tail = None
+        self._size = 0
+        for val in values:
+            self.append(val)
 
     def append(self, val):
         new_node = Node(val)
         if self.head is None:
             self.head = new_node
-            return
-
-        curr = self.head
-        while curr.next is not None:
-            curr = curr.next
-        curr.next = new_node
+        else:
+            self._tail.next = new_node
+        self._tail = new_node
+        self._size += 1
 
     def prepend(self, val):
         self.head = Node(val, self.head)
+        if self._tail is None:
+            self._tail = self.head
+        self._size += 1
 
     def delete(self, val):
         if self.head is None:
@@ -31,6 +44,9 @@ class LinkedList:
 
         if self.head.value == val:
             self.head = self.head.next
+            if self.head is None:
+                self._tail = None
+            self._size -= 1
             return
 
         prev = self.head
@@ -38,14 +54,197 @@ class LinkedList:
         while curr is not None:
             if curr.value == val:
                 prev.next = curr.next
+                if curr is self._tail:
+                    self._tail = prev
+                self._size -= 1
                 return
             prev = curr
             curr = curr.next
 
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        curr = self.head
+        while curr is not None:
+            yield curr.value
+            curr = curr.next
+
     def to_list(self):
-        out = []
+        return list(self)
+
+
+class DoublyNode:
+    __slots__ = ("value", "prev", "next", "owner")
+
+    def __init__(self, value, prev_node=None, next_node=None, owner=None):
+        self.value = value
+        self.prev = prev_node
+        self.next = next_node
+        self.owner = owner  # the list this node is linked into, if any
+
+
+class DoublyLinkedList:
+    """Doubly linked list; append/prepend return the node, which remove() takes in O(1)."""
+
+    def __init__(self, values=()):
+        self.head = None
+        self.tail = None
+        self._size = 0
+        for val in values:
+            self.append(val)
+
+    def append(self, val):
+        node = DoublyNode(val, self.tail, None, self)
+        if self.tail is None:
+            self.head = node
+        else:
+            self.tail.next = node
+        self.tail = node
+        self._size += 1
+        return node
+
+    def prepend(self, val):
+        node = DoublyNode(val, None, self.head, self)
+        if self.head is None:
+            self.tail = node
+        else:
+            self.head.prev = node
+        self.head = node
+        self._size += 1
+        return node
+
+    def remove(self, node):
+        """Unlink ``node`` (a handle returned by append/prepend) from this list."""
+        if node.owner is not self:
+            raise ValueError("node is not in this list")
+        if node.prev is None:
+            self.head = node.next
+        else:
+            node.prev.next = node.next
+        if node.next is None:
+            self.tail = node.prev
+        else:
+            node.next.prev = node.prev
+        node.prev = node.next = node.owner = None
+        self._size -= 1
+        return node.value
+
+    def delete(self, val):
         curr = self.head
         while curr is not None:
-            out.append(curr.value)
+            if curr.value == val:
+                self.remove(curr)
+                return
             curr = curr.next
-        return out
+
+    def pop(self):
+        if self.tail is None:
+            raise IndexError("pop from empty list")
+        return self.remove(self.tail)
+
+    def popleft(self):
+        if self.head is None:
+            raise IndexError("pop from empty list")
+        return self.remove(self.head)
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        curr = self.head
+        while curr is not None:
+            yield curr.value
+            curr = curr.next
+
+    def __reversed__(self):
+        curr = self.tail
+        while curr is not None:
+            yield curr.value
+            curr = curr.prev
+
+    def to_list(self):
+        return list(self)
+
+
+class _Chunk:
+    __slots__ = ("items", "next")
+
+    def __init__(self, items, next_chunk=None):
+        self.items = items
+        self.next = next_chunk
+
+
+class UnrolledLinkedList:
+    """Linked list of small Python lists (chunks) instead of one node per value.
+
+    Same value-level interface as LinkedList (append, prepend, delete, len,
+    iteration, to_list); there are no per-value nodes, so there is no public
+    ``head``. Appends fill the tail chunk and iteration walks whole chunks,
+    so there is one link per ``chunk_size`` values and far less per-value
+    overhead.
+    """
+
+    def __init__(self, values=(), chunk_size=UNROLLED_CHUNK_SIZE):
+        if chunk_size < 2:
+            raise ValueError("chunk_size must be at least 2")
+        self.chunk_size = chunk_size
+        self._head = None
+        self._tail = None
+        self._size = 0
+        for val in values:
+            self.append(val)
+
+    def append(self, val):
+        tail = self._tail
+        if tail is None:
+            self._head = self._tail = _Chunk([val])
+        elif len(tail.items) < self.chunk_size:
+            tail.items.append(val)
+        else:
+            tail.next = self._tail = _Chunk([val])
+        self._size += 1
+
+    def prepend(self, val):
+        head = self._head
+        if head is None:
+            self._head = self._tail = _Chunk([val])
+        elif len(head.items) < self.chunk_size:
+            head.items.insert(0, val)
+        else:
+            self._head = _Chunk([val], head)
+        self._size += 1
+
+    def delete(self, val):
+        prev = None
+        chunk = self._head
+        while chunk is not None:
+            items = chunk.items
+            if val in items:
+                items.remove(val)
+                self._size -= 1
+                if not items:
+                    if prev is None:
+                        self._head = chunk.next
+                    else:
+                        prev.next = chunk.next
+                    if chunk is self._tail:
+                        self._tail = prev
+                return
+            prev = chunk
+            chunk = chunk.next
+
+    def __len__(self):
+        return self._size
+
+    def _chunk_items(self):
+        chunk = self._head
+        while chunk is not None:
+            yield chunk.items
+            chunk = chunk.next
+
+    def __iter__(self):
+        return chain.from_iterable(self._chunk_items())
+
+    def to_list(self):
+        return list(self)
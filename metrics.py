@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""In-process request metrics exported in Prometheus text format.
+
+Recording is per-thread: each worker thread updates its own counters without
+taking a lock, and the shards are only merged when ``/metrics`` is scraped.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable
+
+# Upper bounds (seconds) of the fixed latency histogram buckets; +Inf is implicit.
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class TimedLock:
+    """Drop-in ``threading.Lock`` for ``with`` blocks that records contention.
+
+    The uncontended path is a single non-blocking acquire; only when that
+    fails is the blocking wait timed. Counters are updated while holding the
+    lock, so they need no extra synchronization.
+    """
+
+    __slots__ = ("_lock", "wait_seconds", "contentions")
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.wait_seconds = 0.0
+        self.contentions = 0
+
+    def __enter__(self) -> "TimedLock":
+        if not self._lock.acquire(blocking=False):
+            start = time.perf_counter()
+            self._lock.acquire()
+            self.wait_seconds += time.perf_counter() - start
+            self.contentions += 1
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._lock.release()
+
+
+class _ThreadStats:
+    __slots__ = ("requests", "latency")
+
+    def __init__(self) -> None:
+        self.requests: dict[tuple[str, int], int] = {}
+        # route -> [count per bucket..., count above last bucket, sum of seconds]
+        self.latency: dict[str, list[float]] = {}
+
+
+class Metrics:
+    """Request counters and latency histograms plus scrape-time gauges.
+
+    Set ``per_process`` when several forked processes serve the same port:
+    each one only sees its own counters, so every sample then carries a
+    ``pid`` label and the scraper can sum across processes.
+    """
+
+    def __init__(self, prefix: str = "api", per_process: bool = False) -> None:
+        self.prefix = prefix
+        self.per_process = per_process
+        self._local = threading.local()
+        self._shards: list[_ThreadStats] = []
+        self._shards_lock = threading.Lock()
+        self._gauges: list[tuple[str, str, str, Callable[[], float]]] = []
+
+    def _stats(self) -> _ThreadStats:
+        try:
+            return self._local.stats
+        except AttributeError:
+            stats = self._local.stats = _ThreadStats()
+            with self._shards_lock:
+                self._shards.append(stats)
+            return stats
+
+    def observe(self, route: str, status: int, seconds: float) -> None:
+        stats = self._stats()
+        key = (route, status)
+        stats.requests[key] = stats.requests.get(key, 0) + 1
+        hist = stats.latency.get(route)
+        if hist is None:
+            hist = stats.latency[route] = [0] * (len(LATENCY_BUCKETS) + 1) + [0.0]
+        hist[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        hist[-1] += seconds
+
+    def gauge(self, name: str, help_text: str, fn: Callable[[], float], kind: str = "gauge") -> None:
+        """Register a value sampled at scrape time (kind "gauge" or "counter")."""
+        self._gauges.append((name, help_text, kind, fn))
+
+    def render(self) -> bytes:
+        requests: dict[tuple[str, int], int] = {}
+        latency: dict[str, list[float]] = {}
+        with self._shards_lock:
+            shards = list(self._shards)
+        for stats in shards:
+            # Snapshot first: the owning thread may be inserting concurrently.
+            for key, count in list(stats.requests.items()):
+                requests[key] = requests.get(key, 0) + count
+            for route, hist in list(stats.latency.items()):
+                merged = latency.setdefault(route, [0] * len(hist))
+                for i, value in enumerate(list(hist)):
+                    merged[i] += value
+
+        p = self.prefix
+        # Read at scrape time: the pid changes across fork().
+        pid = f',pid="{os.getpid()}"' if self.per_process else ""
+        only_pid = "{" + pid[1:] + "}" if pid else ""
+        lines = [
+            f"# HELP {p}_requests_total Requests served, by route and status.",
+            f"# TYPE {p}_requests_total counter",
+        ]
+        for (route, status), count in sorted(requests.items()):
+            lines.append(f'{p}_requests_total{{route="{route}",status="{status}"{pid}}} {count}')
+
+        limited = sum(count for (_, status), count in requests.items() if status == 429)
+        lines += [
+            f"# HELP {p}_rate_limited_total Requests rejected with 429.",
+            f"# TYPE {p}_rate_limited_total counter",
+            f"{p}_rate_limited_total{only_pid} {limited}",
+            f"# HELP {p}_request_duration_seconds Request handling latency.",
+            f"# TYPE {p}_request_duration_seconds histogram",
+        ]
+        for route, hist in sorted(latency.items()):
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, hist):
+                cumulative += count
+                lines.append(f'{p}_request_duration_seconds_bucket{{route="{route}",le="{bound}"{pid}}} {cumulative}')
+            cumulative += hist[-2]
+            lines.append(f'{p}_request_duration_seconds_bucket{{route="{route}",le="+Inf"{pid}}} {cumulative}')
+            lines.append(f'{p}_request_duration_seconds_sum{{route="{route}"{pid}}} {hist[-1]:.6f}')
+            lines.append(f'{p}_request_duration_seconds_count{{route="{route}"{pid}}} {cumulative}')
+
+        for name, help_text, kind, fn in self._gauges:
+            lines += [
+                f"# HELP {p}_{name} {help_text}",
+                f"# TYPE {p}_{name} {kind}",
+                f"{p}_{name}{only_pid} {fn()}",
+            ]
+        return ("\n".join(lines) + "\n").encode("utf-8")
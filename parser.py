@@ -2,6 +2,26 @@
 
 from __future__ import annotations
 
+import operator
+import re
+from functools import lru_cache
+from typing import Callable, Mapping
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; batch evaluation falls back to Python
+    np = None
+
+Number = int | float
+
+_BINARY_OPS: dict[str, Callable[[Number, Number], Number]] = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": operator.truediv,
+    "**": operator.pow,
+}
+
 
 class _Parser:
     def __init__(self, expr: str) -> None:
@@ -33,9 +53,9 @@ class _Parser:
         value = self._parse_mul_div()
         while True:
             if self._consume("+"):
-                value = value + self._parse_mul_div()
+                value = self._binary("+", value, self._parse_mul_div())
             elif self._consume("-"):
-                value = value - self._parse_mul_div()
+                value = self._binary("-", value, self._parse_mul_div())
             else:
                 return value
 
@@ -45,9 +65,9 @@ class _Parser:
             if self._peek("**"):
                 return value
             if self._consume("*"):
-                value = value * self._parse_power()
+                value = self._binary("*", value, self._parse_power())
             elif self._consume("/"):
-                value = value / self._parse_power()
+                value = self._binary("/", value, self._parse_power())
             else:
                 return value
 
@@ -56,12 +76,12 @@ class _Parser:
         if self._consume("**"):
             # Right-associative exponentiation: a ** b ** c == a ** (b ** c)
             right = self._parse_power()
-            return left**right
+            return self._binary("**", left, right)
         return left
 
     def _parse_unary(self) -> int | float:
         if self._consume("-"):
-            return -self._parse_unary()
+            return self._negate(self._parse_unary())
         return self._parse_primary()
 
     def _parse_primary(self) -> int | float:
@@ -70,6 +90,17 @@ class _Parser:
             if not self._consume(")"):
                 raise ValueError("Missing closing parenthesis")
             return value
+        return self._parse_operand()
+
+    # Node builders: evaluate immediately here, build closures in _Compiler.
+
+    def _binary(self, op: str, left, right):
+        return _BINARY_OPS[op](left, right)
+
+    def _negate(self, operand):
+        return -operand
+
+    def _parse_operand(self):
         return self._parse_number()
 
     def _parse_number(self) -> int | float:
@@ -98,7 +129,404 @@ class _Parser:
         return float(token) if saw_dot else int(token)
 
 
-def parse_expr(expr: str) -> int | float:
-    """Parse and evaluate an arithmetic expression without using eval()."""
+# ── Iterative (Pratt / precedence-climbing) engine ───────────────────────────
+
+# One token per match; group 1 = number, 2 = operator/paren, 3 = anything else.
+# The number pattern mirrors _parse_number: digits with at most one dot.
+_TOKEN_RE = re.compile(r"\s*(?:(\d+\.?\d*|\.\d+)|(\*\*|[-+*/()])|(\S))")
+
+# Binding power of everything that can sit on the operator stack. Unary minus
+# binds tighter than **, so -2 ** 2 == 4; "(" is 0 so reductions stop there.
+_PRECEDENCE = {"(": 0, "+": 1, "-": 1, "*": 2, "/": 2, "**": 3, "neg": 4}
+# Incoming binary operator -> minimum stack precedence that is reduced first
+# (one higher for the right-associative **).
+_REDUCE_FROM = {"+": 1, "-": 1, "*": 2, "/": 2, "**": 4}
+
+
+def _tokenize(expr: str) -> list[tuple[str, object, int]]:
+    """Split ``expr`` into (kind, value, position) tuples ending with an "end" token."""
+    tokens = []
+    for match in _TOKEN_RE.finditer(expr):
+        number, op, other = match.groups()
+        if number is not None:
+            value = float(number) if "." in number else int(number)
+            tokens.append(("num", value, match.start(1)))
+        elif op is not None:
+            tokens.append((op, None, match.start(2)))
+        else:
+            tokens.append(("?", other, match.start(3)))
+    tokens.append(("end", None, len(expr)))
+    return tokens
+
+
+class _PrattParser:
+    """Evaluates the same grammar as _Parser with explicit stacks, no recursion.
+
+    Results, evaluation order and error messages match _Parser, so nesting
+    depth is limited only by memory.
+    """
+
+    def __init__(self, expr: str) -> None:
+        self.tokens = _tokenize(expr)
+
+    def parse(self) -> int | float:
+        tokens = self.tokens
+        values: list[Number] = []
+        ops: list[str] = []  # binary operators, "neg" and "("
+        depth = 0
+        i = 0
+
+        def reduce() -> None:
+            op = ops.pop()
+            if op == "neg":
+                values.append(-values.pop())
+            else:
+                right = values.pop()
+                values.append(_BINARY_OPS[op](values.pop(), right))
+
+        def reduce_to_paren() -> None:
+            while ops and ops[-1] != "(":
+                reduce()
+
+        while True:
+            # Operand position: prefix operators, then a number.
+            kind, value, pos = tokens[i]
+            i += 1
+            if kind == "-":
+                ops.append("neg")
+                continue
+            if kind == "(":
+                ops.append("(")
+                depth += 1
+                continue
+            if kind != "num":
+                raise ValueError(f"Expected number at position {pos}")
+            values.append(value)
+
+            # Operator position: close parens, then a binary operator or stop.
+            while True:
+                kind, value, pos = tokens[i]
+                if kind == ")" and depth:
+                    reduce_to_paren()
+                    ops.pop()
+                    depth -= 1
+                    i += 1
+                    continue
+                break
+
+            threshold = _REDUCE_FROM.get(kind)
+            if threshold is None:
+                break
+            while ops and _PRECEDENCE[ops[-1]] >= threshold:
+                reduce()
+            ops.append(kind)
+            i += 1
+
+        reduce_to_paren()
+        if depth:
+            raise ValueError("Missing closing parenthesis")
+        if kind != "end":
+            raise ValueError(f"Unexpected token at position {pos}")
+        return values[0]
+
+
+_ENGINES = {"descent": _Parser, "pratt": _PrattParser}
+
+
+def parse_expr(expr: str, engine: str = "descent") -> int | float:
+    """Parse and evaluate an arithmetic expression without using eval().
+
+    ``engine="pratt"`` selects the iterative parser, which has no recursion
+    limit and is faster on long inputs; results and errors are identical.
+    """
+
+    try:
+        parser_cls = _ENGINES[engine]
+    except KeyError:
+        raise ValueError(f"Unknown parser engine: {engine!r}") from None
+    return parser_cls(expr).parse()
+
+
+# Compiled form: a tuple AST -- ("const", value), ("var", name), ("neg", node)
+# or (op, left, right) -- flattened by _build into postfix instructions run
+# by a function ``fn(env) -> number``.
+_Node = Callable[[Mapping[str, Number]], Number]
+
+
+class _Compiler(_Parser):
+    """Same grammar as _Parser plus identifiers, producing a tuple AST.
+
+    Subtrees without variables are folded to constants at compile time,
+    unless folding raises (e.g. ``1 / 0``), in which case the error is left
+    to surface at evaluation time as it would with parse_expr().
+    """
+
+    def __init__(self, expr: str) -> None:
+        super().__init__(expr)
+        self.variables: set[str] = set()
+
+    def _binary(self, op: str, left: tuple, right: tuple) -> tuple:
+        if left[0] == "const" and right[0] == "const":
+            try:
+                return ("const", _BINARY_OPS[op](left[1], right[1]))
+            except ArithmeticError:
+                pass
+        return (op, left, right)
+
+    def _negate(self, operand: tuple) -> tuple:
+        if operand[0] == "const":
+            return ("const", -operand[1])
+        return ("neg", operand)
+
+    def _parse_operand(self) -> tuple:
+        self._skip_ws()
+        start = self.i
+        if start < len(self.expr) and (self.expr[start].isalpha() or self.expr[start] == "_"):
+            while self.i < len(self.expr) and (self.expr[self.i].isalnum() or self.expr[self.i] == "_"):
+                self.i += 1
+            name = self.expr[start:self.i]
+            self.variables.add(name)
+            return ("var", name)
+        return ("const", self._parse_number())
+
+
+_CONST, _VAR, _NEG, _BINARY = range(4)
+
+
+def _build(node: tuple, ops: Mapping[str, Callable]) -> _Node:
+    """Compile an AST to postfix instructions, taking binary operators from ``ops``.
+
+    Neither flattening nor evaluation recurses: the returned function runs
+    the instructions in one loop over an explicit value stack, so an
+    expression nested thousands of levels deep (``x + 1 + 1 + ...``) is fine.
+    """
+    code: list[tuple[int, object]] = []
+    todo = [(node, False)]
+    while todo:
+        node, operands_done = todo.pop()
+        kind = node[0]
+        if kind == "const":
+            code.append((_CONST, node[1]))
+        elif kind == "var":
+            code.append((_VAR, node[1]))
+        elif operands_done:
+            code.append((_NEG, None) if kind == "neg" else (_BINARY, ops[kind]))
+        else:
+            todo.append((node, True))
+            todo.extend((child, False) for child in reversed(node[1:]))
+
+    if len(code) == 1:
+        op, arg = code[0]
+        if op == _CONST:
+            return lambda env: arg
+        return lambda env: env[arg]
+
+    def run(env: Mapping[str, Number]) -> Number:
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        for op, arg in code:
+            if op == _VAR:
+                push(env[arg])
+            elif op == _BINARY:
+                right = pop()
+                stack[-1] = arg(stack[-1], right)
+            elif op == _CONST:
+                push(arg)
+            else:
+                stack[-1] = -stack[-1]
+        return stack[0]
+
+    return run
+
+
+# ── Batch evaluation ─────────────────────────────────────────────────────────
+
+# Integer results are computed in int64 only while every value stays below
+# this bound, so they cannot have wrapped; larger ones go to Python ints.
+_INT_LIMIT = 2 ** 62
+
+
+class _NeedsPython(Exception):
+    """A vectorized result would differ from Python's; evaluate row by row."""
+
+
+def _int_operands(left, right) -> bool:
+    """True if both operands are integers, i.e. NumPy would keep int64."""
+    both = True
+    for operand in (left, right):
+        if isinstance(operand, int):
+            if not -_INT_LIMIT < operand < _INT_LIMIT:
+                raise _NeedsPython
+        elif not isinstance(operand, np.ndarray) or operand.dtype.kind != "i":
+            both = False
+    return both
+
+
+def _int_safe(op: Callable, left, right):
+    """Apply an integer-preserving ufunc, falling back if int64 could wrap."""
+    if _int_operands(left, right):
+        estimate = op(left, right, dtype=float)
+        if np.any(np.abs(estimate) >= _INT_LIMIT):
+            raise _NeedsPython
+    return op(left, right)
+
+
+# int64 values at or above this magnitude are not exact as float64, which
+# np.true_divide converts them to; Python's int / int is correctly rounded.
+_EXACT_FLOAT_INT = 2 ** 53
+
+
+def _array_div(left, right):
+    _int_operands(left, right)  # only for its check of oversized constants
+    for operand in (left, right):
+        if isinstance(operand, int):
+            magnitude = abs(operand)
+        elif isinstance(operand, np.ndarray) and operand.dtype.kind == "i" and operand.size:
+            magnitude = max(abs(int(operand.min())), abs(int(operand.max())))
+        else:
+            continue
+        if magnitude >= _EXACT_FLOAT_INT:
+            raise _NeedsPython
+    if np.any(right == 0):
+        raise ZeroDivisionError("division by zero")
+    return np.true_divide(left, right)
+
+
+def _array_pow(left, right):
+    if np.any((left == 0) & (right < 0)):
+        raise ZeroDivisionError("0.0 cannot be raised to a negative power")
+    if _int_operands(left, right):
+        negative = right < 0
+        if np.all(negative):
+            left = np.asarray(left, dtype=float)  # Python gives a float for every row
+        elif np.any(negative):
+            raise _NeedsPython  # a mix of int and float rows
+        else:
+            with np.errstate(over="ignore"):
+                estimate = np.power(left, right, dtype=float)
+            if np.any(np.abs(estimate) >= _INT_LIMIT):
+                raise _NeedsPython
+            return np.power(left, right)
+    # Python raises OverflowError (or returns a complex) where NumPy gives inf
+    # or nan; let the row-by-row path produce exactly Python's outcome.
+    try:
+        with np.errstate(over="raise", invalid="raise"):
+            return np.power(left, right)
+    except FloatingPointError:
+        raise _NeedsPython from None
+
+
+_ARRAY_OPS: dict[str, Callable] = {
+    "+": lambda left, right: _int_safe(np.add, left, right),
+    "-": lambda left, right: _int_safe(np.subtract, left, right),
+    "*": lambda left, right: _int_safe(np.multiply, left, right),
+    "/": _array_div,
+    "**": _array_pow,
+}
+
+
+def _as_numeric_array(column):
+    """Return ``column`` as an int64/float ndarray, or None if that would change results."""
+    array = column if isinstance(column, np.ndarray) else np.asarray(column)
+    kind = array.dtype.kind
+    if kind in "iu":
+        # Widen small ints (which would wrap early) and keep every value
+        # inside the range where int64 arithmetic is checked.
+        if array.size and not -_INT_LIMIT < int(array.min()) <= int(array.max()) < _INT_LIMIT:
+            return None
+        return array.astype(np.int64, copy=False)
+    if kind == "f" and (isinstance(column, np.ndarray) or not any(type(v) is int for v in column)):
+        # A mixed int/float list would turn int rows into floats.
+        return array
+    return None
+
+
+class CompiledExpr:
+    """A parsed expression that can be evaluated repeatedly without re-parsing.
+
+    >>> f = compile_expr("2 * x + y ** 2")
+    >>> f(x=3, y=4)
+    22
+    """
+
+    __slots__ = ("source", "variables", "_ast", "_fn", "_array_fn")
+
+    def __init__(self, source: str) -> None:
+        compiler = _Compiler(source)
+        self._ast = compiler.parse()
+        self._fn = _build(self._ast, _BINARY_OPS)
+        self._array_fn: _Node | None = None
+        self.source = source
+        self.variables = frozenset(compiler.variables)
+
+    def evaluate(self, variables: Mapping[str, Number] | None = None) -> int | float:
+        try:
+            return self._fn(variables if variables is not None else {})
+        except KeyError as exc:
+            raise ValueError(f"Missing value for variable {exc.args[0]!r}") from None
+
+    def __call__(self, **variables: Number) -> int | float:
+        return self.evaluate(variables)
+
+    def evaluate_batch(self, columns: Mapping[str, object]):
+        """Evaluate once per row over equally long columns of variable values.
+
+        The row count is the length of the columns, so a constant expression
+        is repeated once per row of whatever columns are given.
+
+        With NumPy installed and numeric columns, the whole expression runs
+        vectorized and an ndarray is returned: int columns give int results
+        except where Python would produce floats (``/``, negative powers).
+        Whenever an array result could differ from Python's -- int64 values
+        near overflow, a mix of int and float rows, a float power that would
+        overflow -- or a column is not numeric, each row is evaluated in
+        Python instead and a list is returned, so results (and errors such
+        as OverflowError) are always those of ``evaluate``.
+        """
+        missing = self.variables - columns.keys()
+        if missing:
+            raise ValueError(f"Missing value for variable {sorted(missing)[0]!r}")
+        lengths = {len(column) for column in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError("All columns must have the same length")
+        rows = lengths.pop() if lengths else 0
+
+        if np is not None and self.variables:
+            arrays = {name: _as_numeric_array(columns[name]) for name in self.variables}
+            if all(array is not None for array in arrays.values()):
+                if self._array_fn is None:
+                    self._array_fn = _build(self._ast, _ARRAY_OPS)
+                try:
+                    with np.errstate(over="ignore", invalid="ignore"):  # inf/nan as in Python
+                        return self._array_fn(arrays)
+                except _NeedsPython:
+                    pass
+
+        fn = self._fn
+        names = list(self.variables)
+        if not names:
+            return [fn({})] * rows
+        values = []
+        for name in names:
+            column = columns[name]
+            if np is not None and isinstance(column, np.ndarray):
+                column = column.tolist()  # NumPy scalars would wrap int64 and give nan
+            values.append(column)
+        return [fn(dict(zip(names, row))) for row in zip(*values)]
+
+    def __repr__(self) -> str:
+        return f"CompiledExpr({self.source!r})"
+
+
+@lru_cache(maxsize=1024)
+def compile_expr(expr: str) -> CompiledExpr:
+    """Parse ``expr`` once into a reusable CompiledExpr (cached by source text)."""
+
+    return CompiledExpr(expr)
+
+
+def evaluate_batch(expr: str, columns: Mapping[str, object]):
+    """Shorthand for ``compile_expr(expr).evaluate_batch(columns)``."""
 
-    return _Parser(expr).parse()
+    return compile_expr(expr).evaluate_batch(columns)
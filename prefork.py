@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""Prefork launcher: run several server processes on one port.
+
+Each worker builds its own server with SO_REUSEPORT, so the kernel spreads
+incoming connections across processes. State that must be global across
+workers (such as a SharedMemoryLimiter) has to be created before calling
+run_prefork() so the children inherit it. So does a SIGHUP handler: the
+parent forwards SIGHUP to every worker, which runs the handler it inherited.
+"""
+
+from __future__ import annotations
+
+import os
+import signal
+import sys
+import time
+from typing import Callable
+
+RESPAWN_DELAY = 1.0
+
+
+class _Stop(Exception):
+    pass
+
+
+def _run_child(make_server: Callable[[], object], hup_handler) -> None:
+    if hup_handler is not None:
+        signal.signal(signal.SIGHUP, hup_handler)
+        signal.pthread_sigmask(signal.SIG_UNBLOCK, {signal.SIGHUP})
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    code = 0
+    try:
+        server = make_server()
+        server.serve_forever()
+    except BaseException:
+        import traceback
+
+        traceback.print_exc()
+        code = 1
+    finally:
+        os._exit(code)
+
+
+def _spawn(make_server: Callable[[], object], children: set[int], hup_handler=None) -> None:
+    # With a handler to pass on, SIGHUP stays blocked until the parent has
+    # recorded the pid (so a forwarded signal cannot miss the new worker)
+    # and the child has installed the handler.
+    if hup_handler is not None:
+        signal.pthread_sigmask(signal.SIG_BLOCK, {signal.SIGHUP})
+    try:
+        pid = os.fork()
+        if pid == 0:
+            _run_child(make_server, hup_handler)
+        children.add(pid)
+    finally:
+        if hup_handler is not None:
+            signal.pthread_sigmask(signal.SIG_UNBLOCK, {signal.SIGHUP})
+
+
+def run_prefork(make_server: Callable[[], object], processes: int) -> None:
+    """Fork ``processes`` workers, each serving ``make_server()``; blocks.
+
+    Workers that exit are respawned. SIGINT or SIGTERM in the parent stops
+    all workers and returns. SIGHUP in the parent (e.g. a config reload) is
+    sent on to every worker, which handles it with the SIGHUP handler
+    installed before this call.
+    """
+    if processes < 1:
+        raise ValueError("processes must be at least 1")
+    if not hasattr(os, "fork"):
+        raise RuntimeError("prefork mode requires os.fork()")
+
+    def stop(signum, frame):
+        # os.wait() is retried after signals (PEP 475), so unwind by raising.
+        raise _Stop
+
+    children: set[int] = set()
+
+    def forward(signum, frame):
+        for pid in list(children):
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
+
+    previous = {sig: signal.signal(sig, stop) for sig in (signal.SIGINT, signal.SIGTERM)}
+    hup_handler = None
+    if signal.getsignal(signal.SIGHUP) is not None:  # None: installed outside Python
+        hup_handler = previous[signal.SIGHUP] = signal.signal(signal.SIGHUP, forward)
+    try:
+        for _ in range(processes):
+            _spawn(make_server, children, hup_handler)
+        while children:
+            pid, status = os.wait()
+            children.discard(pid)
+            print(f"[prefork] worker {pid} exited ({status}); respawning", file=sys.stderr)
+            time.sleep(RESPAWN_DELAY)
+            _spawn(make_server, children, hup_handler)
+    except _Stop:
+        pass
+    finally:
+        for sig, handler in previous.items():
+            signal.signal(sig, handler)
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        for pid in children:
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
@@ -1,5 +1,11 @@
 #!/usr/bin/env python3
 
+import re
+from functools import lru_cache
+from typing import Iterable, Iterator, TextIO
+
+from textstream import DEFAULT_CHUNK_SIZE, iter_chunks, whole_words
+
 _ROMAN_PAIRS = [
     (1000, "M"),
     (900, "CM"),
@@ -18,11 +24,10 @@ _ROMAN_PAIRS = [
 
 _ROMAN_VALUES = {symbol: value for value, symbol in _ROMAN_PAIRS}
 
+MAX_VALUE = 3999
 
-def to_roman(n: int) -> str:
-    if not 1 <= n <= 3999:
-        raise ValueError("n must be in range 1..3999")
 
+def _build_numeral(n: int) -> str:
     parts = []
     remaining = n
     for value, symbol in _ROMAN_PAIRS:
@@ -31,23 +36,113 @@ def to_roman(n: int) -> str:
     return "".join(parts)
 
 
+@lru_cache(maxsize=None)
+def _tables() -> tuple[list[str], dict[str, int]]:
+    """Both directions for the whole domain, built on first use.
+
+    Index 0 of the list is a placeholder; 1..3999 map to their canonical
+    numeral, and only canonical numerals appear in the dict.
+    """
+    numerals = [""] + [_build_numeral(n) for n in range(1, MAX_VALUE + 1)]
+    values = {numeral: n for n, numeral in enumerate(numerals) if n}
+    return numerals, values
+
+
+def _numeral(numerals: list[str], n: int) -> str:
+    try:
+        return numerals[n]
+    except TypeError:
+        # Integral non-int values such as 2.0 convert as before the tables.
+        if n == int(n):
+            return numerals[int(n)]
+        return _build_numeral(n)
+
+
+def to_roman(n: int) -> str:
+    if not 1 <= n <= MAX_VALUE:
+        raise ValueError("n must be in range 1..3999")
+
+    return _numeral(_tables()[0], n)
+
+
 def from_roman(s: str) -> int:
     if not s:
         raise ValueError("Roman numeral must be non-empty")
 
-    i = 0
-    total = 0
-    while i < len(s):
-        if i + 1 < len(s) and s[i : i + 2] in _ROMAN_VALUES:
-            total += _ROMAN_VALUES[s[i : i + 2]]
-            i += 2
-        elif s[i] in _ROMAN_VALUES:
-            total += _ROMAN_VALUES[s[i]]
-            i += 1
-        else:
+    value = _tables()[1].get(s)
+    if value is None:
+        raise ValueError(f"Invalid Roman numeral: {s}")
+
+    return value
+
+
+def to_roman_many(numbers: Iterable[int]) -> list[str]:
+    """Convert many integers at once; raises on the first out-of-range value."""
+    numerals = _tables()[0]
+    result = []
+    append = result.append
+    for n in numbers:
+        if not 1 <= n <= MAX_VALUE:
+            raise ValueError("n must be in range 1..3999")
+        append(_numeral(numerals, n))
+    return result
+
+
+def from_roman_many(numerals: Iterable[str]) -> list[int]:
+    """Convert many numerals at once; raises on the first invalid one."""
+    values = _tables()[1]
+    result = []
+    append = result.append
+    for s in numerals:
+        value = values.get(s)
+        if value is None:
+            if not s:
+                raise ValueError("Roman numeral must be non-empty")
             raise ValueError(f"Invalid Roman numeral: {s}")
+        append(value)
+    return result
 
-    if not 1 <= total <= 3999 or to_roman(total) != s:
-        raise ValueError(f"Invalid Roman numeral: {s}")
 
-    return total
+# ── Streaming text rewriting ──────────────────────────────────────────────────
+
+_NUMERAL_WORD_RE = re.compile(r"\b[MDCLXVI]+\b")
+_NUMBER_WORD_RE = re.compile(r"\b[1-9][0-9]{0,3}\b")
+
+
+def rewrite_numerals(
+    source: "str | TextIO | Iterable[str]",
+    to: str = "arabic",
+    min_length: int = 1,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[str]:
+    """Lazily rewrite whole-word numerals in a string, text file or chunk iterable.
+
+    ``to="arabic"`` replaces canonical Roman numerals with decimal numbers;
+    ``to="roman"`` replaces decimal numbers in 1..3999 with numerals. Words
+    that are not valid in the source form are left untouched, as are words
+    shorter than ``min_length`` (use 2 to keep the pronoun "I"). A word
+    split across chunks is held back until it is complete, so output is
+    identical to rewriting the whole text at once.
+    """
+    numerals, values = _tables()
+    if to == "arabic":
+        pattern = _NUMERAL_WORD_RE
+
+        def replace(match: re.Match) -> str:
+            word = match.group()
+            value = values.get(word)
+            return str(value) if value is not None and len(word) >= min_length else word
+
+    elif to == "roman":
+        pattern = _NUMBER_WORD_RE
+
+        def replace(match: re.Match) -> str:
+            word = match.group()
+            n = int(word)
+            return numerals[n] if n <= MAX_VALUE and len(word) >= min_length else word
+
+    else:
+        raise ValueError(f"Unknown target {to!r} (expected 'arabic' or 'roman')")
+
+    for text in whole_words(iter_chunks(source, chunk_size)):
+        yield pattern.sub(replace, text)
@@ -1,5 +1,16 @@
 #!/usr/bin/env python3
 
+import operator
+from functools import lru_cache
+from typing import Callable, Iterable, Iterator, Sequence
+
+_OPERATORS: dict[str, Callable[[float, float], float]] = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": operator.truediv,
+}
+
 
 def evaluate(expression: str) -> float:
     stack = []
@@ -25,3 +36,209 @@ def evaluate(expression: str) -> float:
         raise ValueError("Invalid RPN expression")
 
     return float(stack[0])
+
+
+# ── Compiled programs ─────────────────────────────────────────────────────────
+
+_Node = Callable[[Sequence[float]], float]
+
+# Instructions are (opcode, a, b) tuples in postfix order. Constants never
+# take a stack slot of their own: they are folded, or baked into the
+# operator instruction that consumes them.
+_SLOT = 0          # push row[a]
+_CONST = 1         # push a
+_BINARY = 2        # b = pop(); top = a(top, b)
+_RIGHT_CONST = 3   # top = a(top, b)
+_LEFT_CONST = 4    # top = a(b, top)
+
+# Programs nested at most this deep run as a tree of closures, which
+# CPython calls several times faster than it steps through the
+# instruction loop; deeper ones use the loop and so cannot hit the
+# recursion limit.
+_MAX_CLOSURE_DEPTH = 64
+
+
+def _is_number(token: str) -> bool:
+    try:
+        float(token)
+    except ValueError:
+        return False
+    return True
+
+
+def _closures(code: Sequence[tuple]) -> _Node:
+    """Build nested closures from postfix instructions (without recursing)."""
+    stack: list[_Node] = []
+    for opcode, a, b in code:
+        if opcode == _SLOT:
+            stack.append(lambda row, index=a: row[index])
+        elif opcode == _CONST:
+            stack.append(lambda row, value=a: value)
+        elif opcode == _RIGHT_CONST:
+            stack.append(lambda row, op=a, lhs=stack.pop(), value=b: op(lhs(row), value))
+        elif opcode == _LEFT_CONST:
+            stack.append(lambda row, op=a, rhs=stack.pop(), value=b: op(value, rhs(row)))
+        else:
+            rhs = stack.pop()
+            stack.append(lambda row, op=a, lhs=stack.pop(), rhs=rhs: op(lhs(row), rhs(row)))
+    return stack[0]
+
+
+def _interpreter(code: Sequence[tuple]) -> _Node:
+    """Run postfix instructions in one loop over an explicit value stack."""
+
+    def run(row: Sequence[float]) -> float:
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        for opcode, a, b in code:
+            if opcode == _SLOT:
+                push(row[a])
+            elif opcode == _RIGHT_CONST:
+                stack[-1] = a(stack[-1], b)
+            elif opcode == _BINARY:
+                b = pop()
+                stack[-1] = a(stack[-1], b)
+            elif opcode == _LEFT_CONST:
+                stack[-1] = a(b, stack[-1])
+            else:
+                push(a)
+        return stack[0]
+
+    return run
+
+
+class RPNProgram:
+    """An RPN expression resolved once into a reusable evaluation function.
+
+    Operators are looked up at compile time and constant sub-expressions are
+    folded, leaving a flat postfix instruction list. Identifiers become
+    variable slots, filled positionally in the order given by ``variables``
+    (by default, order of first appearance). Neither compiling nor
+    evaluating recurses per operator, so expression depth is unlimited.
+
+    >>> program = compile_rpn("x 2 * y +")
+    >>> program(3, 1)
+    7.0
+    """
+
+    __slots__ = ("source", "variables", "_code", "_fn")
+
+    def __init__(self, source: str, variables: Sequence[str] | None = None) -> None:
+        slots = {name: i for i, name in enumerate(variables)} if variables is not None else {}
+        code: list[tuple] = []
+        # One (folded value, depth) pair per operand; the value is None if
+        # it is computed at run time.
+        operands: list[tuple[float | None, int]] = []
+        max_depth = 0
+
+        for token in source.split():
+            op = _OPERATORS.get(token)
+            if op is not None:
+                if len(operands) < 2:
+                    raise ValueError("Invalid RPN expression")
+                right, right_depth = operands.pop()
+                left, left_depth = operands.pop()
+                result = None
+                if left is not None and right is not None:
+                    try:
+                        result = op(left, right)
+                    except ArithmeticError:
+                        # e.g. 1 0 /: leave it to raise on every evaluation
+                        code.append((_CONST, left, None))
+                        code.append((_RIGHT_CONST, op, right))
+                elif right is not None:
+                    code.append((_RIGHT_CONST, op, right))
+                elif left is not None:
+                    code.append((_LEFT_CONST, op, left))
+                else:
+                    code.append((_BINARY, op, None))
+                depth = 0 if result is not None else 1 + max(left_depth, right_depth)
+                max_depth = max(max_depth, depth)
+                operands.append((result, depth))
+            elif _is_number(token):
+                operands.append((float(token), 0))
+            elif token.isidentifier() and (variables is None or token in slots):
+                code.append((_SLOT, slots.setdefault(token, len(slots)), None))
+                operands.append((None, 1))
+            else:
+                raise ValueError(f"Unknown RPN token: {token!r}")
+
+        if len(operands) != 1:
+            raise ValueError("Invalid RPN expression")
+
+        self.source = source
+        self.variables = tuple(slots)
+        self._code = tuple(code)
+        constant = operands[0][0]
+        if constant is not None:
+            self._fn: _Node = lambda row: constant
+        elif max_depth <= _MAX_CLOSURE_DEPTH:
+            self._fn = _closures(self._code)
+        else:
+            self._fn = _interpreter(self._code)
+
+    def evaluate(self, values: Sequence[float] = ()) -> float:
+        if len(values) != len(self.variables):
+            raise ValueError(f"Expected {len(self.variables)} values, got {len(values)}")
+        return float(self._fn(values))
+
+    def __call__(self, *values: float) -> float:
+        return self.evaluate(values)
+
+    def evaluate_rows(self, rows: Iterable[Sequence[float]]) -> list[float]:
+        """Evaluate once per row; each row holds one value per variable slot."""
+        fn = self._fn
+        width = len(self.variables)
+        results = []
+        append = results.append
+        for row in rows:
+            if len(row) != width:
+                raise ValueError(f"Expected {width} values, got {len(row)}")
+            append(float(fn(row)))
+        return results
+
+    def __repr__(self) -> str:
+        return f"RPNProgram({self.source!r}, variables={self.variables!r})"
+
+
+@lru_cache(maxsize=1024)
+def _compile_cached(expression: str, variables: tuple[str, ...] | None) -> RPNProgram:
+    return RPNProgram(expression, variables)
+
+
+def compile_rpn(expression: str, variables: Sequence[str] | None = None) -> RPNProgram:
+    """Compile ``expression`` into a reusable RPNProgram (cached by source text)."""
+
+    return _compile_cached(expression, tuple(variables) if variables is not None else None)
+
+
+# evaluate_lines() remembers at most this many distinct lines.
+_LINE_MEMORY = 4096
+
+
+def evaluate_lines(lines: Iterable[str]) -> Iterator[float]:
+    """Lazily evaluate one expression per line, e.g. from an open file.
+
+    A line that repeats is compiled on its second occurrence and the
+    program is reused from then on; one-off lines are just evaluated, which
+    is cheaper than compiling them. Blank lines are skipped. Errors are
+    re-raised as ValueError prefixed with the 1-based line number.
+    """
+    programs: dict[str, RPNProgram | None] = {}  # None: seen once so far
+    for lineno, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            if line not in programs:
+                if len(programs) >= _LINE_MEMORY:
+                    programs.clear()
+                programs[line] = None
+                yield evaluate(line)
+                continue
+            program = programs[line]
+            if program is None:
+                program = programs[line] = RPNProgram(line, ())
+            yield program.evaluate()
+        except ValueError as exc:
+            raise ValueError(f"line {lineno}: {exc}") from exc
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""Delayed-task scheduling on a single timer heap.
+
+Pending timers live in one ``IndexedMinHeap`` ordered by deadline, so
+scheduling and cancelling cost O(log n) and tens of thousands of timers
+need no thread or sleep of their own. Two flavours share that queue:
+
+- ``Scheduler``       one dispatcher thread hands due callbacks to a worker pool
+- ``AsyncScheduler``  runs inside an asyncio loop with a single loop timer armed
+                      for the earliest deadline; coroutine callbacks become tasks
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import itertools
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from heap import IndexedMinHeap
+
+DEFAULT_WORKERS = 4
+
+
+class TimerHandle:
+    """A scheduled call; ``cancel()`` drops it if it has not fired yet."""
+
+    __slots__ = ("when", "callback", "args", "_queue")
+
+    def __init__(self, when: float, callback: Callable, args: tuple, queue: _TimerQueue) -> None:
+        self.when = when
+        self.callback = callback
+        self.args = args
+        self._queue = queue
+
+    def cancel(self) -> bool:
+        """Returns True if the timer was still pending."""
+        return self._queue.cancel(self)
+
+    def __repr__(self) -> str:
+        return f"<TimerHandle when={self.when:.3f} callback={self.callback!r}>"
+
+
+class _TimerQueue:
+    """Heap of pending timers plus dispatch statistics; callers hold the lock."""
+
+    def __init__(self, clock: Callable[[], float]) -> None:
+        self.clock = clock
+        self._heap = IndexedMinHeap()
+        self._seq = itertools.count()  # FIFO among equal deadlines
+        self.fired = 0
+        self.cancelled = 0
+        self.errors = 0
+        self.max_lag = 0.0
+        self.last_lag = 0.0
+        self._total_lag = 0.0
+
+    def _schedule(self, when: float, callback: Callable, args: tuple) -> TimerHandle:
+        handle = TimerHandle(when, callback, args, self)
+        self._heap.push(handle, (when, next(self._seq)))
+        return handle
+
+    def _remove(self, handle: TimerHandle) -> bool:
+        if handle not in self._heap:
+            return False
+        self._heap.remove(handle)
+        self.cancelled += 1
+        return True
+
+    def _pop_due(self, now: float) -> list[TimerHandle]:
+        heap = self._heap
+        due = []
+        while heap and heap.peek().when <= now:
+            handle = heap.pop()
+            lag = now - handle.when
+            self.last_lag = lag
+            self._total_lag += lag
+            if lag > self.max_lag:
+                self.max_lag = lag
+            due.append(handle)
+        self.fired += len(due)
+        return due
+
+    def _next_deadline(self) -> float | None:
+        return self._heap.peek().when if self._heap else None
+
+    def _run(self, handle: TimerHandle) -> bool:
+        try:
+            handle.callback(*handle.args)
+        except Exception:
+            traceback.print_exc()
+            return False
+        return True
+
+    def stats(self) -> dict:
+        """Queue depth and dispatch lag (seconds between deadline and dispatch)."""
+        return {
+            "pending": len(self._heap),
+            "fired": self.fired,
+            "cancelled": self.cancelled,
+            "errors": self.errors,
+            "lag_last": self.last_lag,
+            "lag_max": self.max_lag,
+            "lag_avg": self._total_lag / self.fired if self.fired else 0.0,
+        }
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+
+class Scheduler(_TimerQueue):
+    """Thread-based scheduler: one dispatcher thread, ``workers`` pool threads.
+
+    Callbacks run on the pool, so a slow callback delays neither the
+    dispatcher nor other timers (until all workers are busy; ``running``
+    in ``stats()`` shows how many are in flight or queued for a worker).
+    Exceptions raised by callbacks are printed and counted.
+    """
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, clock: Callable[[], float] = time.monotonic) -> None:
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        super().__init__(clock)
+        self._cond = threading.Condition()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scheduler-worker")
+        self._running = 0
+        self._stopping = False
+        self._thread = threading.Thread(target=self._dispatch_loop, name="scheduler", daemon=True)
+        self._thread.start()
+
+    def call_at(self, when: float, callback: Callable, *args) -> TimerHandle:
+        """Run ``callback(*args)`` once ``clock()`` reaches ``when``."""
+        with self._cond:
+            if self._stopping:
+                raise RuntimeError("scheduler is shut down")
+            handle = self._schedule(when, callback, args)
+            if self._heap.peek() is handle:
+                self._cond.notify()
+        return handle
+
+    def call_later(self, delay: float, callback: Callable, *args) -> TimerHandle:
+        return self.call_at(self.clock() + delay, callback, *args)
+
+    def cancel(self, handle: TimerHandle) -> bool:
+        with self._cond:
+            return self._remove(handle)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {**super().stats(), "running": self._running}
+
+    def _dispatch_loop(self) -> None:
+        with self._cond:
+            while not self._stopping:
+                deadline = self._next_deadline()
+                now = self.clock()
+                if deadline is None or deadline > now:
+                    self._cond.wait(None if deadline is None else deadline - now)
+                    continue
+                for handle in self._pop_due(now):
+                    self._running += 1
+                    self._pool.submit(self._run_on_worker, handle)
+
+    def _run_on_worker(self, handle: TimerHandle) -> None:
+        ok = self._run(handle)
+        with self._cond:
+            self._running -= 1
+            if not ok:
+                self.errors += 1
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop dispatching; pending timers are dropped, running ones finish if ``wait``."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        self._thread.join()
+        self._pool.shutdown(wait=wait)
+
+    def __enter__(self) -> Scheduler:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.shutdown()
+
+
+class AsyncScheduler(_TimerQueue):
+    """Scheduler bound to a running asyncio loop (use from that loop only).
+
+    Only one loop timer is armed at a time, for the earliest deadline.
+    Plain callbacks run inline on the loop; coroutine functions are started
+    as tasks. Uses the loop's clock, as ``loop.call_at`` does.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop | None = None) -> None:
+        self._loop = loop or asyncio.get_running_loop()
+        super().__init__(self._loop.time)
+        self._armed: asyncio.TimerHandle | None = None
+        self._armed_for: float | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    def call_at(self, when: float, callback: Callable, *args) -> TimerHandle:
+        handle = self._schedule(when, callback, args)
+        self._rearm()
+        return handle
+
+    def call_later(self, delay: float, callback: Callable, *args) -> TimerHandle:
+        return self.call_at(self.clock() + delay, callback, *args)
+
+    def cancel(self, handle: TimerHandle) -> bool:
+        removed = self._remove(handle)
+        if removed:
+            self._rearm()
+        return removed
+
+    def _rearm(self) -> None:
+        deadline = self._next_deadline()
+        if deadline == self._armed_for:
+            return
+        if self._armed is not None:
+            self._armed.cancel()
+            self._armed = None
+        self._armed_for = deadline
+        if deadline is not None:
+            self._armed = self._loop.call_at(deadline, self._fire)
+
+    def _fire(self) -> None:
+        self._armed = self._armed_for = None
+        for handle in self._pop_due(self.clock()):
+            if inspect.iscoroutinefunction(handle.callback):
+                task = self._loop.create_task(handle.callback(*handle.args))
+                self._tasks.add(task)
+                task.add_done_callback(self._task_done)
+            elif not self._run(handle):
+                self.errors += 1
+        self._rearm()
+
+    def _task_done(self, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            self.errors += 1
+            traceback.print_exception(task.exception())
+
+    def close(self) -> None:
+        """Drop pending timers and cancel tasks started by this scheduler."""
+        if self._armed is not None:
+            self._armed.cancel()
+        self._armed = self._armed_for = None
+        self._heap = IndexedMinHeap()
+        for task in list(self._tasks):
+            task.cancel()
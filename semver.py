@@ -3,7 +3,10 @@
 from __future__ import annotations
 
 import re
-from functools import total_ordering
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from operator import itemgetter
+from typing import Iterable, Iterator, TypeVar
 
 _SEMVER_RE = re.compile(
     r"^(0|[1-9]\d*)\.(0|[1-9]\d*)\.(0|[1-9]\d*)"
@@ -11,20 +14,98 @@ _SEMVER_RE = re.compile(
     r"(?:\+([0-9A-Za-z-]+(?:\.[0-9A-Za-z-]+)*))?$"
 )
 
+# A release sorts above every prerelease of the same version.
+_RELEASE_KEY = (1,)
+
+# Recently parsed version strings map to one shared instance, so an index
+# repeating the same versions holds one object per distinct string.
+INTERN_CACHE_SIZE = 1 << 16
+
+
+@lru_cache(maxsize=4096)
+def _prerelease(text: str | None) -> tuple[tuple[str, ...], tuple]:
+    """Split a prerelease string into identifiers and their sort key.
+
+    Numeric identifiers compare numerically and below alphanumeric ones;
+    tuple comparison makes a shorter identifier list sort first. The raw
+    text breaks ties so "01" and "1" stay distinct. Cached because an index
+    reuses a handful of prerelease tags across many versions.
+    """
+    if not text:
+        return (), _RELEASE_KEY
+    parts = tuple(text.split("."))
+    return parts, (0, *[(0, int(part), part) if part.isdigit() else (1, part) for part in parts])
+
+
+def _is_plain_release(text: str, major: str, minor: str, patch: str) -> bool:
+    """True if the three dot-separated parts are valid numeric identifiers."""
+    return (
+        major.isdigit() and minor.isdigit() and patch.isdigit() and text.isascii()
+        and (major[0] != "0" or major == "0")
+        and (minor[0] != "0" or minor == "0")
+        and (patch[0] != "0" or patch == "0")
+    )
+
 
-@total_ordering
 class SemVer:
-    def __init__(self, version_str: str) -> None:
-        match = _SEMVER_RE.match(version_str)
-        if not match:
-            raise ValueError(f"Invalid semantic version: {version_str}")
+    """A parsed version; instances for equal version strings are shared.
+
+    Ordering uses ``sort_key``, a plain tuple computed once at parse time,
+    so comparisons never re-inspect prerelease identifiers. Because one
+    instance may be held by many callers, its fields are read-only.
+    """
+
+    __slots__ = ("_original", "_prerelease", "_key")
+
+    def __new__(cls, version_str: str) -> SemVer:
+        if cls is SemVer:
+            return _interned(version_str)
+        return cls._parse(version_str)
+
+    @classmethod
+    def _parse(cls, version_str: str) -> SemVer:
+        parts = version_str.split(".")
+        if len(parts) == 3 and _is_plain_release(version_str, *parts):
+            # Plain X.Y.Z, the common case: no regex needed.
+            major, minor, patch = int(parts[0]), int(parts[1]), int(parts[2])
+            prerelease, prerelease_key = (), _RELEASE_KEY
+        else:
+            match = _SEMVER_RE.match(version_str)
+            if not match:
+                raise ValueError(f"Invalid semantic version: {version_str}")
+            major = int(match.group(1))
+            minor = int(match.group(2))
+            patch = int(match.group(3))
+            prerelease, prerelease_key = _prerelease(match.group(4))
 
+        self = object.__new__(cls)
         self._original = version_str
-        self.major = int(match.group(1))
-        self.minor = int(match.group(2))
-        self.patch = int(match.group(3))
-        prerelease = match.group(4)
-        self.prerelease = tuple(prerelease.split(".")) if prerelease else ()
+        self._prerelease = prerelease
+        self._key = (major, minor, patch, prerelease_key)
+        return self
+
+    @property
+    def major(self) -> int:
+        return self._key[0]
+
+    @property
+    def minor(self) -> int:
+        return self._key[1]
+
+    @property
+    def patch(self) -> int:
+        return self._key[2]
+
+    @property
+    def prerelease(self) -> tuple[str, ...]:
+        return self._prerelease
+
+    def __reduce__(self):
+        return type(self), (self._original,)
+
+    @property
+    def sort_key(self) -> tuple:
+        return self._key
 
     def __str__(self) -> str:
         return self._original
@@ -32,46 +113,327 @@ class SemVer:
     def __repr__(self) -> str:
         return f"SemVer({self._original!r})"
 
+    def __hash__(self) -> int:
+        return hash(self._key)
+
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, SemVer):
             return NotImplemented
-        return self._cmp_tuple() == other._cmp_tuple()
+        return self._key == other._key
 
     def __lt__(self, other: object) -> bool:
         if not isinstance(other, SemVer):
             return NotImplemented
+        return self._key < other._key
+
+    def __le__(self, other: object) -> bool:
+        if not isinstance(other, SemVer):
+            return NotImplemented
+        return self._key <= other._key
 
-        left_base = (self.major, self.minor, self.patch)
-        right_base = (other.major, other.minor, other.patch)
-        if left_base != right_base:
-            return left_base < right_base
+    def __gt__(self, other: object) -> bool:
+        if not isinstance(other, SemVer):
+            return NotImplemented
+        return self._key > other._key
+
+    def __ge__(self, other: object) -> bool:
+        if not isinstance(other, SemVer):
+            return NotImplemented
+        return self._key >= other._key
 
-        return self._prerelease_lt(other)
 
-    def _cmp_tuple(self):
-        return (self.major, self.minor, self.patch, self.prerelease)
+@lru_cache(maxsize=INTERN_CACHE_SIZE)
+def _interned(version_str: str) -> SemVer:
+    return SemVer._parse(version_str)
+
+
+def parse_many(version_strs: Iterable[str]) -> tuple[list[SemVer], list[tuple[int, str]]]:
+    """Parse a batch in one pass, collecting failures instead of raising.
+
+    Returns the valid versions in input order and ``(index, text)`` for
+    every invalid entry. Repeated strings are served from the bounded
+    parse cache shared with ``SemVer()``.
+    """
+    parse = _interned
+    versions: list[SemVer] = []
+    invalid: list[tuple[int, str]] = []
+    append = versions.append
+    for index, text in enumerate(version_strs):
+        try:
+            append(parse(text))
+        except (ValueError, AttributeError, TypeError):  # not a string, e.g. None, bytes or a list
+            invalid.append((index, text))
+    return versions, invalid
+
+
+V = TypeVar("V", str, SemVer)
+
+_first = itemgetter(0)
+
+
+def _keys(versions: Iterable[V]) -> list[tuple[tuple, V]]:
+    parsed: dict[str, tuple] = {}
+    pairs = []
+    for version in versions:
+        if isinstance(version, SemVer):
+            pairs.append((version._key, version))
+            continue
+        key = parsed.get(version)
+        if key is None:
+            key = parsed[version] = SemVer(version)._key
+        pairs.append((key, version))
+    return pairs
+
+
+def sort_versions(versions: Iterable[V], reverse: bool = False) -> list[V]:
+    """Sort version strings and/or SemVer objects by precedence.
+
+    Items are returned as given (strings stay strings); each distinct
+    string is parsed once. The sort is stable, so versions of equal
+    precedence (e.g. differing only in build metadata) keep their order.
+    """
+    pairs = _keys(versions)
+    pairs.sort(key=_first, reverse=reverse)
+    return [version for _, version in pairs]
+
+
+def max_version(versions: Iterable[V]) -> V:
+    """Return the highest-precedence item; raises ValueError if empty."""
+    pairs = _keys(versions)
+    if not pairs:
+        raise ValueError("max_version() arg is an empty iterable")
+    return max(pairs, key=_first)[1]
+
+
+# ── Range constraints ─────────────────────────────────────────────────────────
+
+_COMPARATOR_RE = re.compile(
+    r"^(>=|<=|>|<|=|\^|~)?v?(0|[1-9]\d*|[xX*])(?:\.(0|[1-9]\d*|[xX*]))?(?:\.(0|[1-9]\d*|[xX*]))?"
+    r"(?:-([0-9A-Za-z-]+(?:\.[0-9A-Za-z-]+)*))?"
+    r"(?:\+[0-9A-Za-z-]+(?:\.[0-9A-Za-z-]+)*)?$"
+)
+
+# A bound is (key, inclusive); None on either side of an interval is unbounded.
+Bound = tuple[tuple, bool]
+Interval = tuple[Bound | None, Bound | None]
+
+_MIN_PRERELEASE = _prerelease("0")[1]  # "-0" sorts below every other prerelease
+
+
+def _floor(major: int, minor: int, patch: int) -> tuple:
+    """Key below every version (prereleases included) of major.minor.patch."""
+    return (major, minor, patch, _MIN_PRERELEASE)
+
+
+def _comparator(text: str, constraint: str) -> Interval:
+    match = _COMPARATOR_RE.match(text)
+    if not match:
+        raise ValueError(f"Invalid version constraint: {constraint!r}")
+    op, *parts, prerelease = match.groups()
+    # Wildcards truncate the version: 1.x.3 means 1.x.
+    numbers = []
+    for part in parts:
+        if part is None or part in "xX*":
+            break
+        numbers.append(int(part))
+    if len(numbers) < 3 and prerelease is not None:
+        raise ValueError(f"Invalid version constraint: {constraint!r} (a prerelease needs major.minor.patch)")
+    if not numbers:
+        return None, None
+
+    major, minor, patch = (numbers + [0, 0])[:3]
+    key = (major, minor, patch, _prerelease(prerelease)[1])
+    given = len(numbers)
+    if given == 1:
+        next_floor = _floor(major + 1, 0, 0)
+    elif given == 2:
+        next_floor = _floor(major, minor + 1, 0)
+    else:
+        next_floor = None  # a full version bounds itself
+
+    if op == "^":
+        if major or given == 1:
+            upper = _floor(major + 1, 0, 0)
+        elif minor or given == 2:
+            upper = _floor(0, minor + 1, 0)
+        else:
+            upper = _floor(0, 0, patch + 1)
+        return (key, True), (upper, False)
+    if op == "~":
+        upper = _floor(major + 1, 0, 0) if given == 1 else _floor(major, minor + 1, 0)
+        return (key, True), (upper, False)
+    if op in (None, "="):
+        if next_floor is None:
+            return (key, True), (key, True)
+        return (key, True), (next_floor, False)
+    if op == ">=":
+        return (key, True), None
+    if op == ">":
+        return ((key, False) if next_floor is None else (next_floor, True)), None
+    if op == "<":
+        return None, ((key, False) if next_floor is None else (_floor(major, minor, patch), False))
+    # "<="
+    return None, ((key, True) if next_floor is None else (next_floor, False))
 
-    def _prerelease_lt(self, other: "SemVer") -> bool:
-        # A release version has higher precedence than any prerelease version.
-        if not self.prerelease and not other.prerelease:
-            return False
-        if not self.prerelease:
-            return False
-        if not other.prerelease:
-            return True
 
-        for a, b in zip(self.prerelease, other.prerelease):
-            if a == b:
+def _tighter_lower(a: Bound | None, b: Bound | None) -> Bound | None:
+    if a is None or b is None:
+        return b if a is None else a
+    if a[0] != b[0]:
+        return a if a[0] > b[0] else b
+    return a if not a[1] else b
+
+
+def _tighter_upper(a: Bound | None, b: Bound | None) -> Bound | None:
+    if a is None or b is None:
+        return b if a is None else a
+    if a[0] != b[0]:
+        return a if a[0] < b[0] else b
+    return a if not a[1] else b
+
+
+class Constraint:
+    """A version range such as ``>=1.2.0 <2.0.0-0 || ^3.1``.
+
+    Space-separated comparators are ANDed and ``||`` separates alternatives.
+    Supported comparators: ``=``, ``>``, ``>=``, ``<``, ``<=``, caret
+    (``^1.4``), tilde (``~1.4``), bare or partial versions (``1.4`` means
+    ``>=1.4.0 <1.5.0-0``) and ``x``/``*`` wildcards. Matching is pure
+    precedence ordering: a prerelease that falls inside a range matches it.
+    """
+
+    __slots__ = ("source", "intervals")
+
+    def __init__(self, source: str) -> None:
+        intervals = []
+        for alternative in source.split("||"):
+            comparators = _join_operators(alternative.split())
+            lower = upper = None
+            for text in comparators or ["*"]:
+                lo, hi = _comparator(text, source)
+                lower = _tighter_lower(lower, lo)
+                upper = _tighter_upper(upper, hi)
+            intervals.append((lower, upper))
+        self.source = source
+        self.intervals: tuple[Interval, ...] = tuple(intervals)
+
+    def __contains__(self, version: str | SemVer) -> bool:
+        key = SemVer(version)._key if isinstance(version, str) else version._key
+        for lower, upper in self.intervals:
+            if lower is not None and (key < lower[0] or (key == lower[0] and not lower[1])):
                 continue
-            a_num = a.isdigit()
-            b_num = b.isdigit()
-
-            if a_num and b_num:
-                return int(a) < int(b)
-            if a_num != b_num:
-                # Numeric identifiers always have lower precedence.
-                return a_num
-            return a < b
-
-        # If all compared identifiers are equal, shorter set has lower precedence.
-        return len(self.prerelease) < len(other.prerelease)
+            if upper is not None and (key > upper[0] or (key == upper[0] and not upper[1])):
+                continue
+            return True
+        return False
+
+    def __str__(self) -> str:
+        return self.source
+
+    def __repr__(self) -> str:
+        return f"Constraint({self.source!r})"
+
+
+def _join_operators(tokens: list[str]) -> list[str]:
+    # Allow a space between an operator and its version: ">= 1.2.0".
+    joined: list[str] = []
+    for token in tokens:
+        if joined and joined[-1] in (">=", "<=", ">", "<", "=", "^", "~"):
+            joined[-1] += token
+        else:
+            joined.append(token)
+    return joined
+
+
+@lru_cache(maxsize=1024)
+def parse_constraint(text: str) -> Constraint:
+    """Parse ``text`` into a Constraint (cached by source text)."""
+
+    return Constraint(text)
+
+
+class VersionIndex:
+    """Versions kept in precedence order for range queries by binary search.
+
+    ``add`` inserts in O(log n) comparisons (plus the list shift), and
+    ``matches``/``best_match`` locate each interval of a constraint with two
+    bisections instead of scanning. Adding a version string that is already
+    present is a no-op.
+    """
+
+    def __init__(self, versions: Iterable[str | SemVer] = ()) -> None:
+        self._keys: list[tuple] = []
+        self._versions: list[SemVer] = []
+        self._seen: set[str] = set()
+        self.update(versions)
+
+    def add(self, version: str | SemVer) -> None:
+        version = SemVer(version) if isinstance(version, str) else version
+        if version._original in self._seen:
+            return
+        self._seen.add(version._original)
+        index = bisect_right(self._keys, version._key)
+        self._keys.insert(index, version._key)
+        self._versions.insert(index, version)
+
+    def update(self, versions: Iterable[str | SemVer]) -> None:
+        """Add many versions with one sort rather than one insert each."""
+        pairs = []
+        for version in versions:
+            version = SemVer(version) if isinstance(version, str) else version
+            if version._original not in self._seen:
+                self._seen.add(version._original)
+                pairs.append((version._key, version))
+        if not pairs:
+            return
+        pairs.extend(zip(self._keys, self._versions))
+        pairs.sort(key=_first)
+        self._keys = [key for key, _ in pairs]
+        self._versions = [version for _, version in pairs]
+
+    def _span(self, interval: Interval) -> tuple[int, int]:
+        lower, upper = interval
+        keys = self._keys
+        if lower is None:
+            start = 0
+        else:
+            start = (bisect_left if lower[1] else bisect_right)(keys, lower[0])
+        if upper is None:
+            stop = len(keys)
+        else:
+            stop = (bisect_right if upper[1] else bisect_left)(keys, upper[0])
+        return start, max(start, stop)
+
+    def matches(self, constraint: str | Constraint) -> list[SemVer]:
+        """All indexed versions satisfying ``constraint``, lowest first."""
+        if isinstance(constraint, str):
+            constraint = parse_constraint(constraint)
+        spans = sorted(self._span(interval) for interval in constraint.intervals)
+        result: list[SemVer] = []
+        covered = 0
+        for start, stop in spans:  # alternatives may overlap
+            start = max(start, covered)
+            if start < stop:
+                result.extend(self._versions[start:stop])
+                covered = stop
+        return result
+
+    def best_match(self, constraint: str | Constraint) -> SemVer | None:
+        """The highest indexed version satisfying ``constraint``, or None."""
+        if isinstance(constraint, str):
+            constraint = parse_constraint(constraint)
+        best = -1
+        for interval in constraint.intervals:
+            start, stop = self._span(interval)
+            if stop > start:
+                best = max(best, stop - 1)
+        return self._versions[best] if best >= 0 else None
+
+    def __contains__(self, version: str | SemVer) -> bool:
+        return str(version) in self._seen
+
+    def __len__(self) -> int:
+        return len(self._versions)
+
+    def __iter__(self) -> Iterator[SemVer]:
+        return iter(self._versions)
@@ -0,0 +1,456 @@
+#!/usr/bin/env python3
+"""Serving engines for the BaseHTTPRequestHandler-based API servers.
+
+Three modes share the same handler classes, so routing and rate limiting
+behave identically whichever engine is selected:
+
+- ``single``   plain single-threaded ``HTTPServer`` (the historical default)
+- ``threaded`` ``HTTPServer`` that hands connections to a bounded worker pool
+- ``async``    asyncio/selectors event loop with HTTP/1.1 keep-alive
+"""
+
+from __future__ import annotations
+
+import asyncio
+import io
+import selectors
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import formatdate
+from functools import lru_cache
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Callable
+
+SERVER_MODES = ("single", "threaded", "async")
+DEFAULT_WORKERS = 32
+KEEPALIVE_TIMEOUT = 5.0
+MAX_HEADER_BYTES = 64 * 1024
+
+
+# ── Precompiled responses ─────────────────────────────────────────────────────
+
+_SERVER_HEADER = f"Server: {BaseHTTPRequestHandler.server_version} {BaseHTTPRequestHandler.sys_version}\r\n".encode()
+_date_cache: tuple[int, bytes] = (0, b"")
+
+Headers = tuple[tuple[str, str], ...]
+
+_NOT_FOUND_BODY = b'{"error": "Not Found"}'
+
+
+def _date_header() -> bytes:
+    global _date_cache
+    now = int(time.time())
+    second, line = _date_cache
+    if second != now:
+        line = f"Date: {formatdate(now, usegmt=True)}\r\n".encode()
+        _date_cache = (now, line)
+    return line
+
+
+def _response_parts(
+    protocol: str, status: int, body: bytes, headers: Headers, content_type: str
+) -> tuple[bytes, bytes]:
+    head = f"{protocol} {status} {HTTPStatus(status).phrase}\r\n".encode() + _SERVER_HEADER
+    fields = [("Content-Type", content_type), ("Content-Length", str(len(body))), *headers]
+    tail = "".join(f"{name}: {value}\r\n" for name, value in fields).encode("latin-1")
+    return head, tail + b"\r\n" + body
+
+
+_cached_response_parts = lru_cache(maxsize=1024)(_response_parts)
+
+
+def render_response(
+    protocol: str,
+    status: int,
+    body: bytes,
+    headers: Headers = (),
+    content_type: str = "application/json",
+    cache: bool = True,
+) -> bytes:
+    """Return a complete response.
+
+    With ``cache``, everything but the Date line is memoized per distinct
+    status, body and headers, which suits the handful of constant bodies a
+    server sends over and over. Pass ``cache=False`` for bodies that vary
+    per request, so they are not kept alive in (and do not evict entries
+    from) the memo table.
+    """
+    parts = _cached_response_parts if cache else _response_parts
+    head, tail = parts(protocol, status, body, headers, content_type)
+    return head + _date_header() + tail
+
+
+class RoutingMixin:
+    """Route-table dispatch plus single-write responses for request handlers.
+
+    Subclasses set ``routes`` to a mapping of exact path -> ``handler(self)``;
+    ``route_not_found`` is called for anything else (a JSON 404 by default). ``check_rate_limit``
+    runs first and returns True once it has sent a rejection. When
+    ``metrics`` is set, every GET is recorded with its route, status and
+    latency; unknown paths share the "other" label. Set ``blocking_io`` when
+    handling a request may wait on the network (e.g. a remote rate limiter)
+    so the async server runs it on a worker thread instead of the loop.
+    """
+
+    routes: dict[str, Callable] = {}
+    metrics = None
+    blocking_io = False
+    response_status = 0
+
+    def do_GET(self) -> None:
+        start = time.perf_counter()
+        if not self.check_rate_limit():
+            self.dispatch()
+        if self.metrics is not None:
+            label = self.path if self.path in self.routes else "other"
+            self.metrics.observe(label, self.response_status, time.perf_counter() - start)
+
+    def check_rate_limit(self) -> bool:
+        return False
+
+    def dispatch(self) -> None:
+        route = self.routes.get(self.path)
+        if route is None:
+            self.route_not_found()
+        else:
+            route(self)
+
+    def route_not_found(self) -> None:
+        self.send_static(404, _NOT_FOUND_BODY)
+
+    def send_static(
+        self,
+        status: int,
+        body: bytes,
+        headers: Headers = (),
+        content_type: str = "application/json",
+        cache: bool = True,
+    ) -> None:
+        """Write a pre-serialized body with one wfile.write call.
+
+        The rendered response is memoized unless ``cache`` is False, which
+        callers must pass for bodies that change from request to request.
+        """
+        self.response_status = status
+        self.log_request(status, len(body))
+        self.wfile.write(render_response(self.protocol_version, status, body, headers, content_type, cache))
+
+
+def _keepalive_handler(handler_cls: type[BaseHTTPRequestHandler]) -> type[BaseHTTPRequestHandler]:
+    """Return a subclass of ``handler_cls`` speaking HTTP/1.1 with an idle timeout."""
+    return type(
+        handler_cls.__name__,
+        (handler_cls,),
+        {"protocol_version": "HTTP/1.1", "timeout": KEEPALIVE_TIMEOUT},
+    )
+
+
+class _Connection:
+    """A keep-alive connection and the handler that reads from it."""
+
+    __slots__ = ("sock", "handler", "idle_since")
+
+    def __init__(self, sock: socket.socket, handler: BaseHTTPRequestHandler) -> None:
+        self.sock = sock
+        self.handler = handler
+        self.idle_since = 0.0
+
+
+class PooledHTTPServer(HTTPServer):
+    """HTTPServer that serves requests on a bounded thread pool.
+
+    Workers handle one request at a time. Between requests, connections
+    are parked in a selector watched by one thread and handed back to the
+    pool only when readable, so idle keep-alive clients never hold a
+    worker; a connection left idle for KEEPALIVE_TIMEOUT is closed.
+    """
+
+    request_queue_size = 1024
+
+    def __init__(
+        self, server_address, handler_cls, workers: int = DEFAULT_WORKERS, bind_and_activate: bool = True
+    ) -> None:
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        super().__init__(server_address, _keepalive_handler(handler_cls), bind_and_activate)
+        self.workers = workers
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="api-worker")
+        self._conn_lock = threading.Lock()
+        self._connections: set[socket.socket] = set()  # being served by a worker
+        self._to_park: list[_Connection] = []
+        self._closing = False
+        self._wakeup_r, self._wakeup_w = socket.socketpair()
+        self._wakeup_r.setblocking(False)
+        self._wakeup_w.setblocking(False)
+        self._idle_thread = threading.Thread(target=self._watch_idle, name="api-idle", daemon=True)
+        self._idle_thread.start()
+
+    def process_request(self, request, client_address) -> None:
+        handler = self.RequestHandlerClass.__new__(self.RequestHandlerClass)
+        handler.request = request
+        handler.client_address = client_address
+        handler.server = self
+        handler.setup()
+        # Even the first request may be slow to arrive: wait for it parked.
+        self._park(_Connection(request, handler))
+
+    def _serve_connection(self, conn: _Connection) -> None:
+        handler = conn.handler
+        try:
+            while True:
+                handler.handle_one_request()
+                if handler.close_connection:
+                    break
+                if not self._has_buffered_input(conn):
+                    with self._conn_lock:
+                        self._connections.discard(conn.sock)
+                    self._park(conn)
+                    return
+        except Exception:
+            self.handle_error(conn.sock, handler.client_address)
+        with self._conn_lock:
+            self._connections.discard(conn.sock)
+        self._close(conn)
+
+    @staticmethod
+    def _has_buffered_input(conn: _Connection) -> bool:
+        """True if a pipelined request is already buffered or on the socket."""
+        conn.sock.settimeout(0)
+        try:
+            return bool(conn.handler.rfile.peek(1))
+        except OSError:
+            return True  # let handle_one_request() see the error
+        finally:
+            conn.sock.settimeout(conn.handler.timeout)
+
+    def _close(self, conn: _Connection) -> None:
+        try:
+            conn.handler.finish()
+        except OSError:
+            pass
+        self.shutdown_request(conn.sock)
+
+    def _park(self, conn: _Connection) -> None:
+        with self._conn_lock:
+            if not self._closing:
+                conn.idle_since = time.monotonic()
+                self._to_park.append(conn)
+                conn = None
+        if conn is None:
+            self._wake_idle_thread()
+        else:
+            self._close(conn)
+
+    def _wake_idle_thread(self) -> None:
+        try:
+            self._wakeup_w.send(b"\0")
+        except BlockingIOError:
+            pass  # a wakeup is already pending
+
+    def _watch_idle(self) -> None:
+        selector = selectors.DefaultSelector()
+        selector.register(self._wakeup_r, selectors.EVENT_READ)
+        parked: dict[socket.socket, _Connection] = {}  # in parking order
+        try:
+            while True:
+                timeout = None
+                if parked:
+                    oldest = next(iter(parked.values()))
+                    timeout = max(0.0, oldest.idle_since + KEEPALIVE_TIMEOUT - time.monotonic())
+                for key, _ in selector.select(timeout):
+                    if key.fileobj is self._wakeup_r:
+                        try:
+                            self._wakeup_r.recv(4096)
+                        except BlockingIOError:
+                            pass
+                        continue
+                    selector.unregister(key.fileobj)
+                    conn = parked.pop(key.fileobj)
+                    with self._conn_lock:
+                        self._connections.add(conn.sock)
+                    self._pool.submit(self._serve_connection, conn)
+
+                with self._conn_lock:
+                    closing = self._closing
+                    new, self._to_park = self._to_park, []
+                for conn in new:
+                    parked[conn.sock] = conn
+                    selector.register(conn.sock, selectors.EVENT_READ)
+                if closing:
+                    break
+                deadline = time.monotonic() - KEEPALIVE_TIMEOUT
+                while parked:
+                    sock, conn = next(iter(parked.items()))
+                    if conn.idle_since > deadline:
+                        break
+                    del parked[sock]
+                    selector.unregister(sock)
+                    self._close(conn)
+        finally:
+            for conn in parked.values():
+                self._close(conn)
+            selector.close()
+
+    def server_close(self) -> None:
+        super().server_close()
+        with self._conn_lock:
+            self._closing = True
+        self._wake_idle_thread()
+        self._idle_thread.join()
+        self._wakeup_r.close()
+        self._wakeup_w.close()
+        # Wake workers blocked reading from a slow client.
+        with self._conn_lock:
+            conns = list(self._connections)
+        for conn in conns:
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        self._pool.shutdown(wait=True)
+
+
+class AsyncHTTPServer:
+    """Event-loop server that drives a BaseHTTPRequestHandler per request.
+
+    Requests are framed on the loop, then handed to the (synchronous) handler
+    through in-memory rfile/wfile buffers, so handler code needs no changes.
+    Handlers that set ``blocking_io`` run on the loop's default executor.
+    Exposes the ``serve_forever``/``shutdown``/``server_close`` subset of the
+    ``socketserver`` API.
+    """
+
+    def __init__(self, server_address, handler_cls, backlog: int = 1024, reuse_port: bool = False) -> None:
+        self.RequestHandlerClass = _keepalive_handler(handler_cls)
+        self.socket = socket.create_server(server_address, backlog=backlog, reuse_port=reuse_port)
+        self.socket.setblocking(False)
+        self.server_address = self.socket.getsockname()[:2]
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._stop: asyncio.Event | None = None
+        self._connections: dict[asyncio.Task, asyncio.StreamWriter] = {}
+        self._shutdown_requested = False
+        self._started = threading.Event()
+        self._stopped = threading.Event()
+        self._stopped.set()
+
+    def serve_forever(self) -> None:
+        self._stopped.clear()
+        try:
+            asyncio.run(self._serve())
+        finally:
+            self._shutdown_requested = False
+            self._stopped.set()
+
+    async def _serve(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        server = await asyncio.start_server(
+            self._handle_connection, sock=self.socket, limit=MAX_HEADER_BYTES
+        )
+        self._started.set()
+        if self._shutdown_requested:
+            self._stop.set()
+        async with server:
+            await self._stop.wait()
+            # Close idle keep-alive connections so their tasks finish cleanly.
+            for writer in list(self._connections.values()):
+                writer.close()
+            await asyncio.gather(*self._connections, return_exceptions=True)
+        self._started.clear()
+
+    def shutdown(self) -> None:
+        """Stop serve_forever() and wait for it to return (thread-safe)."""
+        self._shutdown_requested = True
+        if self._started.is_set():
+            self._loop.call_soon_threadsafe(self._stop.set)
+        self._stopped.wait()
+
+    def server_close(self) -> None:
+        self.socket.close()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        peer = writer.get_extra_info("peername") or ("", 0)
+        task = asyncio.current_task()
+        self._connections[task] = writer
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), KEEPALIVE_TIMEOUT)
+                    length = _content_length(head)
+                    body = b""
+                    if length:
+                        body = await asyncio.wait_for(reader.readexactly(length), KEEPALIVE_TIMEOUT)
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError,
+                        asyncio.TimeoutError, ConnectionError, ValueError):
+                    break
+
+                if getattr(self.RequestHandlerClass, "blocking_io", False):
+                    response, close = await self._loop.run_in_executor(None, self._dispatch, head + body, peer)
+                else:
+                    response, close = self._dispatch(head + body, peer)
+                writer.write(response)
+                await writer.drain()
+                if close:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            del self._connections[task]
+            writer.close()
+
+    def _dispatch(self, raw: bytes, peer) -> tuple[bytes, bool]:
+        handler = self.RequestHandlerClass.__new__(self.RequestHandlerClass)
+        handler.server = self
+        handler.request = None
+        handler.client_address = tuple(peer[:2])
+        handler.rfile = io.BytesIO(raw)
+        handler.wfile = io.BytesIO()
+        handler.close_connection = True
+        handler.handle_one_request()
+        return handler.wfile.getvalue(), handler.close_connection
+
+
+def _content_length(head: bytes) -> int:
+    for line in head.split(b"\r\n")[1:]:
+        name, _, value = line.partition(b":")
+        if name.strip().lower() == b"content-length":
+            length = int(value.strip())
+            if length < 0:
+                raise ValueError("negative Content-Length")
+            return length
+    return 0
+
+
+def build_server(
+    handler_cls: type[BaseHTTPRequestHandler],
+    host: str,
+    port: int,
+    mode: str = "single",
+    workers: int = DEFAULT_WORKERS,
+    reuse_port: bool = False,
+) -> HTTPServer | AsyncHTTPServer:
+    """Construct a server for ``handler_cls`` using the requested engine.
+
+    ``reuse_port`` sets SO_REUSEPORT so several processes can each bind the
+    same address and let the kernel balance connections between them.
+    """
+    if mode == "async":
+        return AsyncHTTPServer((host, port), handler_cls, reuse_port=reuse_port)
+    if mode == "single":
+        server = HTTPServer((host, port), handler_cls, bind_and_activate=False)
+    elif mode == "threaded":
+        server = PooledHTTPServer((host, port), handler_cls, workers=workers, bind_and_activate=False)
+    else:
+        raise ValueError(f"Unknown server mode: {mode!r} (expected one of {', '.join(SERVER_MODES)})")
+
+    server.allow_reuse_port = reuse_port
+    try:
+        server.server_bind()
+        server.server_activate()
+    except BaseException:
+        server.server_close()
+        raise
+    return server
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""Rate limiter whose state lives in shared memory, for prefork servers.
+
+The table is an anonymous ``mmap`` created before the workers fork, so every
+process sees the same counters and a client gets one global limit rather
+than one per worker. Each slot holds a 64-bit key hash and a GCRA
+theoretical-arrival time in integer nanoseconds (16 bytes), so the table size
+is fixed up front. Slots are grouped into stripes, each guarded by its own
+process-shared lock; a key only ever probes the slots of its own stripe.
+
+A worker that dies while holding a stripe lock would otherwise wedge that
+stripe for good, so each stripe also records the pid of its holder. A waiter
+that has not got the lock after LOCK_TIMEOUT seconds takes it over if the
+recorded process no longer exists (see ``_take_over``).
+"""
+
+from __future__ import annotations
+
+import math
+import mmap
+import multiprocessing
+import os
+import struct
+import time
+from hashlib import blake2b
+
+_SLOT = struct.Struct("<Qq")  # key hash (0 = empty), theoretical arrival time (ns)
+PROBE_LENGTH = 8
+LOCK_TIMEOUT = 1.0  # seconds before checking whether a lock holder is still alive
+
+
+def _key_hash(key: str) -> int:
+    # Stable across processes, unlike hash(); 0 is reserved for empty slots.
+    return int.from_bytes(blake2b(key.encode(), digest_size=8).digest(), "little") or 1
+
+
+def _alive(pid: int) -> bool:
+    if pid <= 0:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class SharedMemoryLimiter:
+    """GCRA limiter over a fixed-size, process-shared hash table.
+
+    Admits ``limit`` requests per ``window`` seconds per key, with bursts of
+    up to ``limit``. When all probe slots for a key hold live entries, the
+    one closest to expiry is evicted, so memory never grows past ``slots``
+    entries. Must be created before forking.
+    """
+
+    def __init__(self, limit: int, window: float, slots: int = 1 << 16, stripes: int = 64) -> None:
+        if slots < stripes * PROBE_LENGTH:
+            raise ValueError("slots must be at least stripes * PROBE_LENGTH")
+        self.limit = limit
+        self.window = window
+        self.slots = slots
+        # Integer nanoseconds, as in api2.GCRALimiter: float rounding in
+        # tat + interval can cut the last request of a full burst.
+        self._window_ns = round(window * 1_000_000_000)
+        self._interval_ns = self._window_ns // limit
+        self._per_stripe = slots // stripes
+        self._locks = [multiprocessing.Lock() for _ in range(stripes)]
+        self._recovery_lock = multiprocessing.Lock()
+        self._mm = mmap.mmap(-1, self._per_stripe * stripes * _SLOT.size)
+        self._owners_mm = mmap.mmap(-1, stripes * 8)
+        self._owners = memoryview(self._owners_mm).cast("q")  # holder pid per stripe, 0 = free
+        self.wait_seconds = 0.0  # per process
+        self.lock_recoveries = 0  # per process
+
+    def _acquire(self, stripe: int) -> None:
+        lock = self._locks[stripe]
+        if not lock.acquire(False):
+            start = time.perf_counter()
+            while not lock.acquire(timeout=LOCK_TIMEOUT):
+                if lock.acquire(False) or self._take_over(stripe):
+                    break
+            self.wait_seconds += time.perf_counter() - start
+        self._owners[stripe] = os.getpid()
+
+    def _take_over(self, stripe: int) -> bool:
+        """Inherit a stripe lock whose recorded holder has died; True on success.
+
+        Owner 0 means the holder is releasing (or never recorded itself), so
+        it is waited for. The owner is re-read and replaced under
+        ``_recovery_lock``, so of several waiters that saw the same dead pid
+        only one takes over; its release() then frees the lock again.
+        """
+        owner = self._owners[stripe]
+        if not owner or _alive(owner):
+            return False
+        if not self._recovery_lock.acquire(timeout=LOCK_TIMEOUT):
+            return False
+        try:
+            if self._owners[stripe] != owner:
+                return False
+            self._owners[stripe] = os.getpid()
+        finally:
+            self._recovery_lock.release()
+        self.lock_recoveries += 1
+        return True
+
+    def _release(self, stripe: int) -> None:
+        self._owners[stripe] = 0
+        self._locks[stripe].release()
+
+    def check(self, key: str) -> tuple[bool, int]:
+        """Returns (limited, retry_after_seconds) and records the hit if allowed."""
+        h = _key_hash(key)
+        stripes = len(self._locks)
+        stripe = h % stripes
+        base = stripe * self._per_stripe
+        start = (h // stripes) % self._per_stripe
+        mm = self._mm
+        now = time.time_ns()
+
+        self._acquire(stripe)
+        try:
+            found = free = victim = None
+            victim_tat = math.inf
+            for i in range(PROBE_LENGTH):
+                offset = (base + (start + i) % self._per_stripe) * _SLOT.size
+                slot_hash, tat = _SLOT.unpack_from(mm, offset)
+                if slot_hash == h:
+                    found = offset
+                    break
+                if slot_hash == 0 or tat <= now:
+                    if free is None:
+                        free = offset
+                elif tat < victim_tat:
+                    victim, victim_tat = offset, tat
+
+            if found is not None:
+                tat = max(_SLOT.unpack_from(mm, found)[1], now)
+            else:
+                found = free if free is not None else victim
+                tat = now
+
+            new_tat = tat + self._interval_ns
+            allow_at = new_tat - self._window_ns
+            if allow_at > now:
+                return True, max(1, -((now - allow_at) // 1_000_000_000))
+            _SLOT.pack_into(mm, found, h, new_tat)
+            return False, 0
+        finally:
+            self._release(stripe)
+
+    def __len__(self) -> int:
+        """Number of slots holding a live (unexpired) entry."""
+        now = time.time_ns()
+        return sum(
+            1 for slot_hash, tat in _SLOT.iter_unpack(self._mm) if slot_hash and tat > now
+        )
+
+    def memory_estimate(self) -> int:
+        return len(self._mm) + len(self._owners_mm)
+
+    @property
+    def lock_wait_seconds(self) -> float:
+        return self.wait_seconds
+
+    def clear(self) -> None:
+        for stripe in range(len(self._locks)):
+            self._acquire(stripe)
+        try:
+            self._mm[:] = bytes(len(self._mm))
+        finally:
+            for stripe in range(len(self._locks)):
+                self._release(stripe)
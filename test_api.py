@@ -1,12 +1,17 @@
 """Tests for api.py — /healthz endpoint and rate limiting."""
 
+import http.client
 import json
 import threading
 import time
 import urllib.request
 import urllib.error
 
-from api import make_server, RATE_LIMIT, RATE_WINDOW, _rate_buckets, _rate_lock
+from api import make_server, RATE_LIMIT, RATE_WINDOW, ShardedRateLimiter, _limiter, _read_version
+from api2 import GCRALimiter
+import serving
+from filecache import FileCache
+from shmlimiter import SharedMemoryLimiter
 
 PORT = 18080
 BASE = f"http://127.0.0.1:{PORT}"
@@ -29,9 +34,31 @@ def get(path, headers=None):
         return e.code, json.loads(e.read()), dict(e.headers)
 
 
+def start_mode_server(mode, port):
+    server = make_server("127.0.0.1", port, mode=mode, workers=4)
+    t = threading.Thread(target=server.serve_forever, daemon=True)
+    t.start()
+    time.sleep(0.1)
+    return server
+
+
+def keepalive_gets(port, path, count):
+    """Issue `count` GETs over one HTTP/1.1 connection; returns the statuses."""
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    statuses = []
+    try:
+        for _ in range(count):
+            conn.request("GET", path)
+            resp = conn.getresponse()
+            resp.read()
+            statuses.append(resp.status)
+    finally:
+        conn.close()
+    return statuses
+
+
 def clear_rate_buckets():
-    with _rate_lock:
-        _rate_buckets.clear()
+    _limiter.clear()
 
 
 # ── Tests ─────────────────────────────────────────────────────────────────────
@@ -75,6 +102,264 @@ def test_404_for_unknown_path():
     print("  PASS: unknown path returns 404")
 
 
+def test_threaded_mode_serves_concurrent_clients():
+    clear_rate_buckets()
+    server = start_mode_server("threaded", PORT + 1)
+    try:
+        # Idle keep-alive clients, one per worker, must not block other
+        # connections: half have sent nothing yet, half finished a request.
+        idle = []
+        for i in range(server.workers):
+            conn = http.client.HTTPConnection("127.0.0.1", PORT + 1, timeout=5)
+            conn.connect()
+            if i % 2:
+                conn.request("GET", "/healthz")
+                conn.getresponse().read()
+            idle.append(conn)
+        start = time.monotonic()
+        assert keepalive_gets(PORT + 1, "/healthz", 1) == [200]
+        elapsed = time.monotonic() - start
+        assert elapsed < 1.0, f"Probe waited {elapsed:.2f}s behind idle connections"
+
+        results = []
+        workers = [
+            threading.Thread(target=lambda: results.extend(keepalive_gets(PORT + 1, "/healthz", 3)))
+            for _ in range(3)
+        ]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join(5)
+        for conn in idle:
+            conn.close()
+        assert results == [200] * 9, f"Unexpected statuses: {results}"
+    finally:
+        server.shutdown()
+        server.server_close()
+    print("  PASS: threaded mode serves concurrent keep-alive clients")
+
+
+def test_async_mode_keepalive_and_rate_limit():
+    clear_rate_buckets()
+    server = start_mode_server("async", PORT + 2)
+    try:
+        statuses = keepalive_gets(PORT + 2, "/healthz", RATE_LIMIT + 1)
+        assert statuses[:RATE_LIMIT] == [200] * RATE_LIMIT, f"Unexpected statuses: {statuses}"
+        assert statuses[-1] == 429, f"Expected 429 after limit, got {statuses[-1]}"
+        assert keepalive_gets(PORT + 2, "/nope", 1) == [429]
+    finally:
+        server.shutdown()
+        server.server_close()
+        clear_rate_buckets()
+    print("  PASS: async mode keeps connections alive and shares the rate limiter")
+
+
+def test_limiter_evicts_keys_beyond_memory_cap():
+    limiter = ShardedRateLimiter(limit=2, window=60, shards=4, max_keys=40)
+    for i in range(1000):
+        limiter.check(f"10.0.{i // 256}.{i % 256}")
+    assert len(limiter) <= 40, f"Limiter kept {len(limiter)} keys"
+    # A recently seen key keeps its window after eviction churn.
+    assert limiter.check("1.2.3.4") == (False, 0)
+    assert limiter.check("1.2.3.4") == (False, 0)
+    limited, retry_after = limiter.check("1.2.3.4")
+    assert limited and 0 < retry_after <= 61, (limited, retry_after)
+    print("  PASS: limiter stays within its key cap")
+
+
+def test_gcra_limiter_admits_exact_burst():
+    from unittest import mock
+    with mock.patch("time.time_ns", return_value=1_700_000_000_123_456_789):  # a frozen clock
+        for limit in (1, 11, 97, 10000):
+            limiter = GCRALimiter(limit, 60)
+            allowed = sum(not limiter.check("k")[0] for _ in range(limit + 5))
+            assert allowed == limit, f"limit {limit} admitted {allowed}"
+        limiter = GCRALimiter(10, 60)
+        for _ in range(10):
+            limiter.check("1.2.3.4")
+        limited, retry_after = limiter.check("1.2.3.4")
+        # One slot frees up every window / limit seconds.
+        assert limited and retry_after == 6, (limited, retry_after)
+        assert limiter.check("5.6.7.8") == (False, 0), "keys must not share a budget"
+    assert isinstance(limiter.lock_wait_seconds, float)
+    print("  PASS: GCRA limiter admits exactly `limit` requests with a Retry-After")
+
+
+def test_version_cache_reloads_only_on_change():
+    import os, tempfile
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "config.json")
+        cache = FileCache(path, _read_version, check_interval=0)
+        assert cache.get() == "unknown" and cache.reloads == 1
+        with open(path, "w") as f:
+            f.write('{"version": "2.0.0"}')
+        assert cache.get() == "2.0.0" and cache.reloads == 2
+        assert cache.get() == "2.0.0" and cache.reloads == 2, "Unchanged file was re-read"
+        cache.invalidate()
+        assert cache.get() == "2.0.0" and cache.reloads == 3
+        os.remove(path)
+        assert cache.get() == "unknown" and cache.reloads == 4
+    print("  PASS: version cache reloads only when config.json changes")
+
+
+def test_metrics_endpoint_exports_prometheus_text():
+    clear_rate_buckets()
+    get("/healthz")
+    req = urllib.request.Request(f"{BASE}/metrics")
+    with urllib.request.urlopen(req) as resp:
+        content_type = resp.headers["Content-Type"]
+        text = resp.read().decode()
+    assert content_type.startswith("text/plain"), content_type
+    assert 'api_requests_total{route="/healthz",status="200"}' in text, text
+    assert 'api_request_duration_seconds_bucket{route="/healthz",le="+Inf"}' in text
+    assert "api_rate_limiter_keys 1" in text
+    # Every scrape differs; none may be kept in the response memo table.
+    size = serving._cached_response_parts.cache_info().currsize
+    for _ in range(5):
+        with urllib.request.urlopen(req) as resp:
+            resp.read()
+    assert serving._cached_response_parts.cache_info().currsize == size, "/metrics bodies were memoized"
+    print("  PASS: /metrics exports request counters and limiter gauges")
+
+
+def test_response_cache_holds_only_constant_bodies():
+    cache = serving._cached_response_parts
+    size = cache.cache_info().currsize
+    for i in range(50):
+        response = serving.render_response("HTTP/1.1", 200, f'{{"n": {i}}}'.encode(), cache=False)
+        assert response.endswith(f'{{"n": {i}}}'.encode())
+    assert cache.cache_info().currsize == size, "uncached bodies entered the memo table"
+    first = serving.render_response("HTTP/1.1", 200, b'{"status": "ok"}')
+    hits = cache.cache_info().hits
+    assert serving.render_response("HTTP/1.1", 200, b'{"status": "ok"}') == first
+    assert cache.cache_info().hits == hits + 1
+    print("  PASS: response cache holds only constant bodies")
+
+
+def test_shared_memory_limiter_is_global_across_processes():
+    import os
+    if not hasattr(os, "fork"):
+        print("  SKIP: shared-memory limiter needs os.fork()")
+        return
+    limiter = SharedMemoryLimiter(limit=5, window=60, slots=1024, stripes=8)
+    pid = os.fork()
+    if pid == 0:
+        allowed = sum(not limiter.check("10.0.0.1")[0] for _ in range(3))
+        os._exit(0 if allowed == 3 else 1)
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0, "child was limited early"
+    # The child's three hits count against the parent's budget.
+    assert limiter.check("10.0.0.1") == (False, 0)
+    assert limiter.check("10.0.0.1") == (False, 0)
+    limited, retry_after = limiter.check("10.0.0.1")
+    assert limited and 0 < retry_after <= 61, (limited, retry_after)
+    assert len(limiter) == 1
+    print("  PASS: shared-memory limiter enforces one limit across processes")
+
+
+def test_shared_memory_limiter_admits_exact_burst():
+    from unittest import mock
+    with mock.patch("time.time_ns", return_value=1_700_000_000_123_456_789):
+        for limit in (1, 11, 97, 10000):
+            limiter = SharedMemoryLimiter(limit, 60, slots=1024, stripes=8)
+            allowed = sum(not limiter.check("k")[0] for _ in range(limit + 5))
+            assert allowed == limit, f"limit {limit} admitted {allowed}"
+        limiter = SharedMemoryLimiter(10, 60, slots=1024, stripes=8)
+        for _ in range(10):
+            limiter.check("1.2.3.4")
+        assert limiter.check("1.2.3.4") == (True, 6)
+    print("  PASS: shared-memory limiter admits exactly `limit` requests")
+
+
+def test_shared_memory_limiter_recovers_lock_of_dead_worker():
+    import os
+    import shmlimiter
+    if not hasattr(os, "fork"):
+        print("  SKIP: shared-memory limiter needs os.fork()")
+        return
+    limiter = SharedMemoryLimiter(limit=5, window=60, slots=1024, stripes=8)
+    pid = os.fork()
+    if pid == 0:
+        for stripe in range(8):
+            limiter._acquire(stripe)
+        os._exit(0)  # dies holding every stripe lock
+    os.waitpid(pid, 0)
+    saved, shmlimiter.LOCK_TIMEOUT = shmlimiter.LOCK_TIMEOUT, 0.05
+    try:
+        assert limiter.check("10.0.0.2") == (False, 0)
+        assert limiter.lock_recoveries == 1
+        limiter.clear()  # the other seven stripes
+        assert limiter.lock_recoveries == 8
+        assert limiter.check("10.0.0.2") == (False, 0), "recovered locks must be free again"
+        assert limiter.lock_recoveries == 8
+        # Only a recorded, dead holder is replaced, and only by one waiter.
+        limiter._locks[0].acquire()
+        for owner in (0, os.getpid()):  # releasing, or alive
+            limiter._owners[0] = owner
+            assert not limiter._take_over(0)
+        limiter._owners[0] = pid
+        assert limiter._take_over(0) and not limiter._take_over(0)
+        limiter._release(0)
+        assert limiter.lock_recoveries == 9
+    finally:
+        shmlimiter.LOCK_TIMEOUT = saved
+    print("  PASS: shared-memory limiter recovers locks held by a dead worker")
+
+
+def test_prefork_forwards_sighup_to_workers():
+    import os, select, signal
+    if not hasattr(os, "fork") or not hasattr(signal, "SIGHUP"):
+        print("  SKIP: prefork needs os.fork() and SIGHUP")
+        return
+    from prefork import run_prefork
+
+    class IdleServer:
+        def serve_forever(self):
+            os.write(w, b"r")
+            while True:
+                time.sleep(1)
+
+    def read_bytes(count):
+        data = b""
+        while len(data) < count and select.select([r], [], [], 5)[0]:
+            data += os.read(r, count - len(data))
+        return data
+
+    r, w = os.pipe()
+    master = os.fork()
+    if master == 0:
+        signal.signal(signal.SIGHUP, lambda signum, frame: os.write(w, b"h"))
+        run_prefork(IdleServer, 2)
+        os._exit(0)
+    try:
+        assert read_bytes(2) == b"rr", "workers did not start"
+        os.kill(master, signal.SIGHUP)
+        got = read_bytes(2)
+        assert got == b"hh", f"SIGHUP must reach both workers: {got!r}"
+        assert not select.select([r], [], [], 0.2)[0], "workers must keep serving, master must only forward"
+    finally:
+        os.kill(master, signal.SIGTERM)
+        os.waitpid(master, 0)
+        os.close(r)
+        os.close(w)
+    print("  PASS: prefork master forwards SIGHUP to its workers")
+
+
+def test_metrics_carry_pid_label_per_process():
+    import os
+    from metrics import Metrics
+    metrics = Metrics("t", per_process=True)
+    metrics.observe("/healthz", 200, 0.001)
+    metrics.gauge("keys", "Keys.", lambda: 3)
+    text = metrics.render().decode()
+    pid = os.getpid()
+    assert f't_requests_total{{route="/healthz",status="200",pid="{pid}"}} 1' in text, text
+    assert f't_rate_limited_total{{pid="{pid}"}} 0' in text
+    assert f't_request_duration_seconds_count{{route="/healthz",pid="{pid}"}} 1' in text
+    assert f't_keys{{pid="{pid}"}} 3' in text
+    print("  PASS: per-process metrics are labelled with the pid")
+
+
 if __name__ == "__main__":
     print("Starting test server...")
     server = setup_server()
@@ -85,6 +370,18 @@ if __name__ == "__main__":
         test_healthz_version_matches_config,
         test_rate_limit_returns_429,
         test_404_for_unknown_path,
+        test_threaded_mode_serves_concurrent_clients,
+        test_async_mode_keepalive_and_rate_limit,
+        test_limiter_evicts_keys_beyond_memory_cap,
+        test_gcra_limiter_admits_exact_burst,
+        test_version_cache_reloads_only_on_change,
+        test_metrics_endpoint_exports_prometheus_text,
+        test_response_cache_holds_only_constant_bodies,
+        test_shared_memory_limiter_is_global_across_processes,
+        test_shared_memory_limiter_admits_exact_burst,
+        test_shared_memory_limiter_recovers_lock_of_dead_worker,
+        test_prefork_forwards_sighup_to_workers,
+        test_metrics_carry_pid_label_per_process,
     ]
 
     passed = failed = 0
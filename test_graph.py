@@ -0,0 +1,76 @@
+import random
+
+from graph import Graph
+
+g = Graph()
+for u, v in [(1, 2), (1, 3), (2, 4), (3, 4), (4, 5), (6, 6)]:
+    g.add_edge(u, v)
+assert g.bfs(1) == [1, 2, 3, 4, 5]
+assert g.dfs(1) == [1, 2, 4, 3, 5]
+
+# Frozen CSR form: same traversal order as the mutable graph
+frozen = g.freeze()
+assert len(frozen) == 6 and frozen.edge_count == 6 and 6 in frozen
+assert frozen.neighbors(4) == [2, 3, 5] and frozen.neighbors(6) == [6]
+assert frozen.bfs(1) == g.bfs(1) and frozen.dfs(1) == g.dfs(1)
+assert frozen.bfs(99) == [99] and frozen.dfs(99) == [99]
+
+# Node types need only be comparable among neighbours, as in Graph
+mixed = Graph()
+for u, v in [("b", "a"), ("a", "c"), (2, 1), ((0, 1), (0, 0))]:
+    mixed.add_edge(u, v)
+frozen = mixed.freeze()
+assert frozen.nodes == ["b", "a", "c", 2, 1, (0, 1), (0, 0)]
+for start in ("a", 1, (0, 0)):
+    assert frozen.bfs(start) == mixed.bfs(start) and frozen.dfs(start) == mixed.dfs(start)
+
+rng = random.Random(0)
+g = Graph()
+for _ in range(300):
+    g.add_edge(f"n{rng.randrange(60)}", f"n{rng.randrange(60)}")
+frozen = g.freeze()
+for start in list(g.adj)[:10]:
+    assert frozen.bfs(start) == g.bfs(start), start
+    assert frozen.dfs(start) == g.dfs(start), start
+
+# Frozen dfs is iterative: a path far deeper than the recursion limit
+path = Graph()
+for i in range(20_000):
+    path.add_edge(i, i + 1)
+assert path.freeze().dfs(0) == list(range(20_001))
+assert path.dfs(0) == list(range(20_001))
+
+# Distances and point-to-point queries
+grid = Graph()
+for r in range(5):
+    for c in range(5):
+        if c < 4:
+            grid.add_edge((r, c), (r, c + 1))
+        if r < 4:
+            grid.add_edge((r, c), (r + 1, c))
+assert grid.bfs_distances((0, 0))[(4, 4)] == 8
+nearest = grid.multi_source_bfs([(0, 0), (4, 4)])
+assert nearest[(0, 4)] == 4 and nearest[(3, 3)] == 2 and nearest[(4, 4)] == 0
+route = grid.shortest_path((0, 0), (4, 4))
+assert len(route) == 9 and route[0] == (0, 0) and route[-1] == (4, 4)
+grid.add_edge("island", "isle")
+assert grid.shortest_path((0, 0), "island") is None
+assert grid.shortest_path("x", "x") == ["x"]
+
+# Weighted shortest paths
+roads = Graph()
+roads.add_edge("a", "b", 4)
+roads.add_edge("a", "c", 1)
+roads.add_edge("c", "b", 2)
+roads.add_edge("b", "d", 5)
+assert roads.dijkstra("a") == {"a": 0, "c": 1, "b": 3, "d": 8}
+assert roads.weighted_path("a", "d") == (8, ["a", "c", "b", "d"])
+assert roads.weighted_path("a", "zz") is None
+assert roads.shortest_path("a", "d") == ["a", "b", "d"]
+try:
+    roads.add_edge("a", "e", -1)
+    assert False, "Should have raised ValueError"
+except ValueError:
+    pass
+
+print("ALL TESTS PASSED")
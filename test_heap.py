@@ -0,0 +1,69 @@
+import random
+
+from heap import IndexedMinHeap, MinHeap, heapify
+
+# Push/pop order
+heap = MinHeap()
+for value in [5, 3, 8, 1, 9, 2]:
+    heap.push(value)
+assert len(heap) == 6 and heap.peek() == 1
+assert [heap.pop() for _ in range(6)] == [1, 2, 3, 5, 8, 9]
+try:
+    heap.pop()
+    assert False, "Should have raised IndexError"
+except IndexError:
+    pass
+
+# O(n) construction agrees with repeated push
+rng = random.Random(0)
+values = [rng.randrange(1000) for _ in range(500)]
+heap = MinHeap.from_iterable(values)
+assert [heap.pop() for _ in range(len(values))] == sorted(values)
+
+# pushpop / replace
+heap = heapify([4, 6, 8])
+assert heap.pushpop(1) == 1
+assert heap.pushpop(5) == 4 and heap.peek() == 5
+assert heap.replace(0) == 5 and heap.peek() == 0
+try:
+    MinHeap().replace(1)
+    assert False, "Should have raised IndexError"
+except IndexError:
+    pass
+
+# nsmallest leaves the heap intact
+heap = heapify(values)
+assert heap.nsmallest(10) == sorted(values)[:10]
+assert heap.nsmallest(0) == [] and len(heap) == len(values)
+
+# key= orders by key only; items need not be comparable
+tasks = [{"name": n, "priority": p} for n, p in [("b", 2), ("a", 1), ("c", 3), ("z", 0)]]
+heap = heapify(tasks, key=lambda task: task["priority"])
+assert heap.pushpop({"name": "x", "priority": 5})["name"] == "z"
+assert [task["name"] for task in heap.nsmallest(2)] == ["a", "b"]
+assert [heap.pop()["name"] for _ in range(len(heap))] == ["a", "b", "c", "x"]
+
+# Indexed heap: re-prioritize and cancel by handle
+queue = IndexedMinHeap.from_iterable([("a", 5), ("b", 3), ("c", 8), ("d", 1)])
+queue.push("e", 4)
+assert not isinstance(queue, MinHeap) and queue.peek() == "d" and len(queue) == 5
+assert "c" in queue and queue.contains("e") and "zz" not in queue
+queue.update_priority("c", 0)
+queue.update_priority("d", 9)
+assert queue.remove("b") == 3 and "b" not in queue
+assert queue.priority("a") == 5
+assert [queue.pop() for _ in range(len(queue))] == ["c", "e", "a", "d"]
+for call in (lambda: queue.remove("a"), lambda: queue.update_priority("a", 1)):
+    try:
+        call()
+        assert False, "Should have raised KeyError"
+    except KeyError:
+        pass
+queue.push("x", 1)
+try:
+    queue.push("x", 2)
+    assert False, "Should have raised ValueError"
+except ValueError:
+    pass
+
+print("ALL TESTS PASSED")
@@ -0,0 +1,118 @@
+"""Tests for limitd.py — networked limiter daemon and RemoteLimiter fallback."""
+
+import os
+import socket
+import tempfile
+import threading
+import time
+import urllib.request
+
+import api2
+from api2 import GCRALimiter, SlidingWindowLimiter
+from limitd import MAX_LINE_BYTES, LimiterDaemon, RemoteLimiter
+
+
+def start_daemon(address, limit=3):
+    daemon = LimiterDaemon(address, SlidingWindowLimiter(limit, 60))
+    threading.Thread(target=daemon.serve_forever, daemon=True).start()
+    assert daemon.wait_ready(), "daemon did not start"
+    return daemon
+
+
+def unused_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+# Two nodes share one limit through the daemon
+daemon = start_daemon(("127.0.0.1", 0))
+node_a = RemoteLimiter(daemon.server_address, fallback=GCRALimiter(3, 60))
+node_b = RemoteLimiter(daemon.server_address, fallback=GCRALimiter(3, 60))
+assert node_a.check("10.0.0.1") == (False, 0)
+assert node_b.check("10.0.0.1") == (False, 0)
+assert node_a.check("10.0.0.1") == (False, 0)
+limited, retry_after = node_b.check("10.0.0.1")
+assert limited and 0 < retry_after <= 60, (limited, retry_after)
+assert node_a.remote_errors == node_b.remote_errors == 0
+
+# Pipelined batch: results come back in request order
+results = node_a.check_many(["k1", "k2", "k1", "k1", "k1", "odd key\n"])
+assert [r[0] for r in results] == [False, False, False, False, True, False], results
+node_a.close()
+node_b.close()
+
+# Concurrent checks beyond the pool size are coalesced into batches
+class CountingLimiter(RemoteLimiter):
+    def _request(self, keys):
+        batches.append(len(keys))
+        time.sleep(0.005)
+        return super()._request(keys)
+
+batches = []
+shared = CountingLimiter(daemon.server_address, fallback=GCRALimiter(3, 60), pool_size=1)
+outcomes = []
+threads = [
+    threading.Thread(target=lambda: outcomes.extend(shared.check("burst") for _ in range(5)))
+    for _ in range(16)
+]
+for t in threads:
+    t.start()
+for t in threads:
+    t.join()
+assert len(outcomes) == 80 and sum(not limited for limited, _ in outcomes) == 3, outcomes
+assert sum(batches) == 80 and max(batches) > 1 and len(batches) < 80, batches
+shared.close()
+
+# A line longer than MAX_LINE_BYTES drops the connection
+with socket.create_connection(daemon.server_address, timeout=5) as sock:
+    try:
+        sock.sendall(b"C " + b"x" * (MAX_LINE_BYTES * 4))
+        closed = sock.recv(1) == b""
+    except ConnectionError:
+        closed = True
+    assert closed, "oversized line must close the connection"
+with socket.create_connection(daemon.server_address, timeout=5) as sock:
+    sock.sendall(b"C " + b"x" * (MAX_LINE_BYTES - 2) + b"\n")
+    assert sock.recv(16).endswith(b"\n")
+daemon.shutdown()
+
+# api2 --mode async runs requests off the loop when the limiter blocks
+daemon = start_daemon(("127.0.0.1", 0), limit=100)
+saved = api2._limiter
+api2.use_limiter(RemoteLimiter(daemon.server_address, fallback=GCRALimiter(100, 60)))
+try:
+    assert api2.Handler.blocking_io
+    server = api2.make_server(port=0, mode="async")
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = "http://127.0.0.1:%d/healthz" % server.server_address[1]
+    with urllib.request.urlopen(url, timeout=5) as resp:
+        assert resp.status == 200
+    server.shutdown()
+    server.server_close()
+finally:
+    api2._limiter.close()
+    api2.use_limiter(saved)
+assert not api2.Handler.blocking_io
+daemon.shutdown()
+
+# UNIX socket transport
+with tempfile.TemporaryDirectory() as tmp:
+    path = os.path.join(tmp, "limitd.sock")
+    daemon = start_daemon(path, limit=1)
+    client = RemoteLimiter(path, fallback=GCRALimiter(1, 60))
+    assert client.check("x") == (False, 0)
+    assert client.check("x")[0] is True
+    client.close()
+    daemon.shutdown()
+
+# Unreachable daemon: fall back to the local limiter
+fallback = GCRALimiter(2, 60)
+offline = RemoteLimiter(("127.0.0.1", unused_port()), fallback=fallback, retry_interval=60)
+assert offline.check("y") == (False, 0)
+assert offline.check("y") == (False, 0)
+assert offline.check("y")[0] is True
+assert offline.remote_errors == 1, "daemon should not be retried within retry_interval"
+assert len(offline) == len(fallback) == 1
+
+print("ALL TESTS PASSED")
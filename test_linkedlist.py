@@ -0,0 +1,59 @@
+from linkedlist import DoublyLinkedList, LinkedList, UnrolledLinkedList
+
+# Singly linked: tail and size stay correct through deletes
+for cls in (LinkedList, UnrolledLinkedList):
+    ll = cls()
+    for i in range(5):
+        ll.append(i)
+    ll.prepend(-1)
+    assert ll.to_list() == [-1, 0, 1, 2, 3, 4] and len(ll) == 6
+    ll.delete(4)  # tail
+    ll.delete(-1)  # head
+    ll.delete(99)  # absent
+    ll.append(5)
+    assert ll.to_list() == [0, 1, 2, 3, 5] and len(ll) == 5, cls
+    for val in [0, 1, 2, 3, 5]:
+        ll.delete(val)
+    ll.append(7)
+    assert list(ll) == [7] and len(ll) == 1, cls
+
+# Unrolled: values spread over several chunks
+ul = UnrolledLinkedList(range(10), chunk_size=4)
+ul.prepend(-1)
+for val in (4, 5, 6, 7):  # empties a middle chunk
+    ul.delete(val)
+assert ul.to_list() == [-1, 0, 1, 2, 3, 8, 9] and len(ul) == 7
+
+# Doubly linked: O(1) removal by node handle
+dl = DoublyLinkedList("abc")
+node = dl.append("d")
+first = dl.prepend("z")
+assert dl.remove(node) == "d" and dl.remove(first) == "z"
+dl.delete("b")
+assert dl.to_list() == ["a", "c"] and list(reversed(dl)) == ["c", "a"] and len(dl) == 2
+assert dl.pop() == "c" and dl.popleft() == "a" and len(dl) == 0
+try:
+    dl.pop()
+    assert False, "Should have raised IndexError"
+except IndexError:
+    pass
+
+# remove() rejects nodes owned by another list, or already removed
+a, b = DoublyLinkedList(), DoublyLinkedList("xy")
+stray = a.append("s")
+for bad in (stray, b.head.next):
+    try:
+        (b if bad is stray else a).remove(bad)
+        assert False, "Should have raised ValueError"
+    except ValueError:
+        pass
+removed = b.head
+b.remove(removed)
+try:
+    b.remove(removed)
+    assert False, "Should have raised ValueError"
+except ValueError:
+    pass
+assert a.to_list() == ["s"] and b.to_list() == ["y"] and len(b) == 1
+
+print("ALL TESTS PASSED")
@@ -1,4 +1,7 @@
-from parser import parse_expr
+import random
+
+import parser
+from parser import compile_expr, evaluate_batch, parse_expr
 
 # Basic arithmetic
 assert parse_expr("2 + 3") == 5
@@ -31,4 +34,112 @@ assert parse_expr("1.5 * 2") == 3.0
 assert parse_expr("2+3") == 5
 assert parse_expr("  2  +  3  ") == 5
 
+# Iterative engine: same results and errors, no recursion limit
+for expr in ["2 + 3 * 4", "2 ** 3 ** 2", "-(2 + 3)", "2 * -3", "-2 ** 2", "2 ** -2 ** 2",
+             "(10 - 2) * (3 + 1)", "1.5 * 2", "  2  +  3  ", "8 / 2 + 1", "--3"]:
+    assert parse_expr(expr, engine="pratt") == parse_expr(expr), expr
+for bad in ["2 3", "(1", "", "2 *", "1 )", "()", "2 * * 3", "x", "(1 2"]:
+    errors = []
+    for engine in ("descent", "pratt"):
+        try:
+            parse_expr(bad, engine=engine)
+        except ValueError as exc:
+            errors.append(str(exc))
+    assert len(errors) == 2 and errors[0] == errors[1], (bad, errors)
+assert parse_expr("(" * 5000 + "1" + ")" * 5000, engine="pratt") == 1
+assert parse_expr("-" * 5001 + "1", engine="pratt") == -1
+
+# Compiled expressions with variables
+f = compile_expr("2 * x + y ** 2")
+assert f.variables == {"x", "y"}
+assert f(x=3, y=4) == 22
+assert f.evaluate({"x": 0.5, "y": 1}) == 2.0
+assert compile_expr("2 * x + y ** 2") is f          # cached by source text
+assert compile_expr("-x ** 2")(x=3) == 9             # same unary/power binding as parse_expr
+assert compile_expr("2 ** 3 ** 2")() == 512
+assert compile_expr("(1 + 2) * 4")() == parse_expr("(1 + 2) * 4")
+assert isinstance(compile_expr("10 / 5")(), float)
+assert compile_expr("x" + " + 1" * 3000)(x=1) == 3001    # evaluation does not recurse per operator
+assert compile_expr("-(x" + " - y" * 3000 + ")")(x=1, y=2) == 5999
+
+try:
+    f(x=1)
+    assert False, "Should have raised ValueError"
+except ValueError:
+    pass
+
+try:
+    parse_expr("x + 1")
+    assert False, "parse_expr must not accept variables"
+except ValueError:
+    pass
+
+try:
+    compile_expr("1 / 0")()
+    assert False, "Should have raised ZeroDivisionError"
+except ZeroDivisionError:
+    pass
+
+# Batch evaluation matches row-by-row results (vectorized when NumPy is present)
+g = compile_expr("-x ** 2 + y / 2 - 2 ** z")
+xs, ys, zs = [1, 2, 3, -4], [2, 4, 6, 8], [3, -1, 0, 2]
+expected = [g(x=x, y=y, z=z) for x, y, z in zip(xs, ys, zs)]
+for numpy_module in (parser.np, None):
+    saved, parser.np = parser.np, numpy_module
+    try:
+        got = [v.item() if hasattr(v, "item") else v for v in g.evaluate_batch({"x": xs, "y": ys, "z": zs})]
+    finally:
+        parser.np = saved
+    assert got == expected, (got, expected)
+    assert [type(v) for v in got] == [type(v) for v in expected]
+
+ints = [v.item() if hasattr(v, "item") else v for v in evaluate_batch("x * 3 - 1", {"x": [1, 2, 3]})]
+assert list(evaluate_batch("x" + " + 1" * 3000, {"x": [0, 1]})) == [3000, 3001]
+assert ints == [2, 5, 8] and all(type(v) is int for v in ints)
+assert list(evaluate_batch("2 + 3", {"x": [1, 2, 3]})) == [5, 5, 5]  # one row per column entry
+
+# Int-only columns: no float promotion, no int64 wraparound, Python's overflow errors
+def batch(expr, columns):
+    return [v.item() if hasattr(v, "item") else v for v in evaluate_batch(expr, columns)]
+
+mixed = batch("2 ** z", {"z": [3, -1]})
+assert mixed == [8, 0.5] and type(mixed[0]) is int, mixed
+assert batch("2 ** z", {"z": [-1, -2]}) == [0.5, 0.25]
+assert batch("x * x", {"x": [2 ** 40, 3]}) == [2 ** 80, 9]
+assert batch("x + 1", {"x": [2 ** 63 - 1]}) == [2 ** 63]
+assert batch("x ** 3 - y", {"x": [10 ** 7, 2], "y": [1, 1]}) == [10 ** 21 - 1, 7]
+assert batch("x * 10.0 ** 300 * 10.0 ** 300", {"x": [1.0]}) == [float("inf")]  # as in Python, no error
+# int / int above 2**53 is rounded as Python rounds it, not via float64
+rng = random.Random(1)
+xs = [rng.randrange(2 ** 53, 2 ** 61) for _ in range(2000)]
+ys = [rng.randrange(1, 2 ** 40) for _ in range(2000)]
+assert batch("x / y", {"x": xs, "y": ys}) == [x / y for x, y in zip(xs, ys)]
+
+# ndarray columns get the same results as lists, including in the Python fallback
+if parser.np is not None:
+    np = parser.np
+    assert batch("x * x", {"x": np.array([2 ** 40, 3])}) == [2 ** 80, 9]
+    assert batch("x * 3 - 1", {"x": np.array([1, 2, 3])}) == [2, 5, 8]
+    roots = batch("x ** 0.5", {"x": np.array([-1.0, 4.0])})
+    assert roots == [(-1.0) ** 0.5, 2.0] and type(roots[0]) is complex, roots
+    assert batch("x / y", {"x": np.array(xs), "y": np.array(ys)}) == [x / y for x, y in zip(xs, ys)]
+
+try:
+    evaluate_batch("x ** 2", {"x": [10.0 ** 200, 1.0]})
+    assert False, "Should have raised OverflowError"
+except OverflowError:
+    pass
+
+try:
+    evaluate_batch("x / y", {"x": [1, 2], "y": [1, 0]})
+    assert False, "Should have raised ZeroDivisionError"
+except ZeroDivisionError:
+    pass
+
+try:
+    evaluate_batch("x + y", {"x": [1, 2]})
+    assert False, "Should have raised ValueError"
+except ValueError:
+    pass
+
 print("ALL TESTS PASSED")
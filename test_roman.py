@@ -0,0 +1,52 @@
+import io
+import time
+
+from roman import from_roman, from_roman_many, rewrite_numerals, to_roman, to_roman_many
+
+# Round trip over the whole domain
+for n in range(1, 4000):
+    assert from_roman(to_roman(n)) == n, n
+assert to_roman(1994) == "MCMXCIV"
+
+# Non-canonical and out-of-range input is rejected
+for bad in ["", "IIII", "IC", "VX", "iv", "MMMM"]:
+    try:
+        from_roman(bad)
+        assert False, f"Should have raised ValueError for {bad!r}"
+    except ValueError:
+        pass
+for bad in [0, 4000, -1]:
+    try:
+        to_roman(bad)
+        assert False, f"Should have raised ValueError for {bad!r}"
+    except ValueError:
+        pass
+
+# Integral floats convert as before; other floats are still rejected
+assert to_roman(2.0) == "II" and to_roman_many([4.0]) == ["IV"]
+try:
+    to_roman(2.5)
+    assert False, "Should have raised TypeError"
+except TypeError:
+    pass
+
+# Bulk conversion
+assert to_roman_many([1, 4, 3999]) == ["I", "IV", "MMMCMXCIX"]
+assert from_roman_many(["I", "IV", "MMMCMXCIX"]) == [1, 4, 3999]
+
+# Streaming rewrite, independent of chunk boundaries
+doc = "Chapter XIV ends in 1999; I said MCMXC, not IIII or 4000.\n" * 3
+expected = "Chapter 14 ends in 1999; I said 1990, not IIII or 4000.\n" * 3
+for size in (1, 3, 64):
+    assert "".join(rewrite_numerals(io.StringIO(doc), min_length=2, chunk_size=size)) == expected
+assert "".join(rewrite_numerals("in 1999, 12 of 4000", to="roman")) == "in MCMXCIX, XII of 4000"
+assert "".join(rewrite_numerals(["X", "", "IV ", "", "", "C", "X"])) == "14 110"
+
+# A long word run spanning many chunks is held back without rescanning
+long_doc = "XIV " + "V" * 1_000_000 + " IX"
+start = time.perf_counter()
+out = "".join(rewrite_numerals(io.StringIO(long_doc), chunk_size=4096))
+assert time.perf_counter() - start < 5, "rescanning the held-back word per chunk"
+assert out == "14 " + "V" * 1_000_000 + " 9"
+
+print("ALL TESTS PASSED")
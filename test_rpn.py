@@ -0,0 +1,66 @@
+import io
+
+from rpn import compile_rpn, evaluate, evaluate_lines
+
+# Existing API
+assert evaluate("3 4 + 2 *") == 14.0
+assert evaluate("10 4 /") == 2.5
+
+# Compiled programs agree with evaluate()
+for expr in ["3 4 + 2 *", "1 2 + 3 4 - * 5 /", "2.5", "1e3 2 -"]:
+    assert compile_rpn(expr)() == evaluate(expr), expr
+assert compile_rpn("3 4 +") is compile_rpn("3 4 +")
+
+# Variable slots: order of first appearance, or as given
+program = compile_rpn("x 2 * y -")
+assert program.variables == ("x", "y")
+assert program(5, 1) == 9.0
+assert compile_rpn("x 2 * y -", variables=["y", "x"])(1, 5) == 9.0
+assert program.evaluate_rows([(1, 0), (2, 1), (3, 2)]) == [2.0, 3.0, 4.0]
+
+# Errors surface at compile time; division by zero at evaluation time
+for bad in ["1 +", "1 2", "x y +"]:
+    try:
+        compile_rpn(bad, variables=["x"])
+        assert False, f"Should have raised ValueError for {bad!r}"
+    except ValueError:
+        pass
+try:
+    compile_rpn("x 0 /")(1)
+    assert False, "Should have raised ZeroDivisionError"
+except ZeroDivisionError:
+    pass
+try:
+    program(1)
+    assert False, "Should have raised ValueError"
+except ValueError:
+    pass
+
+# No recursion: long chains and deep stacks compile and evaluate
+assert compile_rpn("x " + "1 + " * 3000)(1) == 3001.0
+assert compile_rpn("x " * 3000 + "+ " * 2999)(1) == 3000.0
+assert compile_rpn("2 x " + "1 + " * 3000 + "*")(0) == 6000.0
+
+# Streaming many expressions from a file
+assert list(evaluate_lines(io.StringIO("1 2 +\n\n6 3 /\n"))) == [3.0, 2.0]
+try:
+    list(evaluate_lines(["1 2 +", "1 +"]))
+    assert False, "Should have raised ValueError"
+except ValueError as exc:
+    assert str(exc) == "line 2: Invalid RPN expression", exc
+try:
+    list(evaluate_lines(["1 2 +", "1 x +"]))
+    assert False, "Should have raised ValueError"
+except ValueError as exc:
+    assert str(exc) == "line 2: could not convert string to float: 'x'", exc
+try:
+    list(evaluate_lines(["1 0 /"]))
+    assert False, "Should have raised ZeroDivisionError"
+except ZeroDivisionError:
+    pass
+
+# Repeated lines are compiled once and give the same results
+lines = ["3 4 + 2 *\n", "10 4 /\n", "1 2 3 * -\n"] * 500
+assert list(evaluate_lines(lines)) == [evaluate(line) for line in lines]
+
+print("ALL TESTS PASSED")
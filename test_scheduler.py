@@ -0,0 +1,55 @@
+import asyncio
+import contextlib
+import io
+import threading
+import time
+
+from scheduler import AsyncScheduler, Scheduler
+
+# Thread scheduler: deadline order, cancellation, stats
+fired = []
+done = threading.Event()
+with contextlib.redirect_stderr(io.StringIO()) as err, Scheduler(workers=2) as sched:
+    sched.call_later(0.06, fired.append, "c")
+    sched.call_later(0.02, fired.append, "a")
+    sched.call_later(0.04, fired.append, "b")
+    dropped = sched.call_later(0.03, fired.append, "x")
+    assert dropped.cancel() and not dropped.cancel()
+    sched.call_later(0.08, done.set)
+    sched.call_later(0.01, lambda: 1 / 0)  # counted, does not stop the scheduler
+    assert sched.stats()["pending"] == 5
+    assert done.wait(2)
+    time.sleep(0.01)
+    stats = sched.stats()
+assert fired == ["a", "b", "c"], fired
+assert "ZeroDivisionError" in err.getvalue()
+assert stats["pending"] == 0 and stats["fired"] == 5 and stats["cancelled"] == 1 and stats["errors"] == 1
+assert stats["lag_max"] >= 0
+
+# Many pending timers are cheap to add and cancel
+with Scheduler() as sched:
+    handles = [sched.call_later(60 + i * 1e-3, fired.append, i) for i in range(20_000)]
+    for handle in handles[::2]:
+        handle.cancel()
+    assert len(sched) == 10_000
+
+
+# asyncio flavour: sync callbacks inline, coroutine callbacks as tasks
+async def main():
+    sched = AsyncScheduler()
+    order = []
+
+    async def coro(tag):
+        order.append(tag)
+
+    sched.call_later(0.03, order.append, "sync")
+    sched.call_later(0.01, coro, "async")
+    sched.call_later(0.02, order.append, "dropped").cancel()
+    await asyncio.sleep(0.08)
+    assert order == ["async", "sync"], order
+    assert sched.stats()["fired"] == 2 and sched.stats()["cancelled"] == 1
+    sched.close()
+
+asyncio.run(main())
+
+print("ALL TESTS PASSED")
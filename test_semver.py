@@ -1,4 +1,6 @@
-from semver import SemVer
+import pickle
+
+from semver import SemVer, VersionIndex, max_version, parse_constraint, parse_many, sort_versions
 
 # Basic comparison
 assert SemVer("1.0.0") > SemVer("0.9.9")
@@ -36,4 +38,76 @@ assert SemVer("1.0.0-alpha.1") < SemVer("1.0.0-alpha.beta")  # 1 (numeric) < bet
 assert str(SemVer("1.2.3-rc.1")) == "1.2.3-rc.1"
 assert str(SemVer("1.0.0")) == "1.0.0"
 
+# Identical version strings share one instance; instances are hashable
+assert SemVer("1.2.3-rc.1") is SemVer("1.2.3-rc.1")
+assert pickle.loads(pickle.dumps(SemVer("1.2.3"))) == SemVer("1.2.3")
+assert len({SemVer("1.0.0"), SemVer("1.0.0+build.5"), SemVer("1.0.1")}) == 2
+
+# Bulk helpers keep the input type and order ties stably
+shuffled = [versions[i] for i in (6, 0, 3, 1, 7, 5, 2, 4)]
+assert sort_versions(shuffled) == versions
+assert sort_versions(shuffled, reverse=True) == versions[::-1]
+assert sort_versions([SemVer("2.0.0"), "1.0.0"]) == ["1.0.0", SemVer("2.0.0")]
+assert sort_versions(["1.0.0+b", "1.0.0+a"]) == ["1.0.0+b", "1.0.0+a"]
+assert max_version(shuffled) == "1.0.0"
+try:
+    max_version([])
+    assert False, "Should have raised ValueError"
+except ValueError:
+    pass
+
+# Range constraints
+caret = parse_constraint("^1.4")
+assert "1.4.0" in caret and "1.9.3" in caret
+assert "1.3.9" not in caret and "2.0.0-0" not in caret and "2.0.0" not in caret
+assert "0.2.9" in parse_constraint("^0.2.1") and "0.3.0" not in parse_constraint("^0.2.1")
+assert "1.4.7" in parse_constraint("~1.4") and "1.5.0" not in parse_constraint("~1.4")
+explicit = parse_constraint(">=1.2.0 <2.0.0-0")
+assert "1.2.0" in explicit and "2.0.0-rc.1" not in explicit
+either = parse_constraint("1.x || >= 3.0.0")
+assert "1.7.0" in either and "3.1.0" in either and "2.0.0" not in either
+for bad in [">>1.0.0", "1.2.3.4", "latest", "1.2-beta", "^1-rc.1", "1.x.3-beta"]:
+    try:
+        parse_constraint(bad)
+        assert False, f"Should have raised ValueError for {bad!r}"
+    except ValueError:
+        pass
+
+# Indexed resolution, with incremental inserts
+index = VersionIndex(["1.0.0", "1.4.0", "2.0.0-rc.1", "1.4.2", "2.0.0"])
+index.add("1.5.0-beta")
+index.add("1.4.2")  # already present
+assert len(index) == 6
+assert [str(v) for v in index.matches("^1.4")] == ["1.4.0", "1.4.2", "1.5.0-beta"]
+assert str(index.best_match(">=1.2.0 <2.0.0-0")) == "1.5.0-beta"
+assert str(index.best_match("~1.4 || ^2")) == "2.0.0"
+assert index.best_match(">2.0.0") is None
+assert index.matches("^3") == []
+
+# Batch parsing: plain releases take the fast path, failures are collected
+for bad in ["01.2.3", "1.02.3", "1.2", "1.2.3.4", "1..3", "\uff11.2.3"]:
+    try:
+        SemVer(bad)
+        assert False, f"Should have raised ValueError for {bad!r}"
+    except ValueError:
+        pass
+assert SemVer("10.0.20").sort_key == (10, 0, 20, (1,))
+
+# Instances are shared per string, so their fields cannot be changed
+shared = SemVer("3.1.4-rc.1")
+assert (shared.major, shared.minor, shared.patch, shared.prerelease) == (3, 1, 4, ("rc", "1"))
+for field in ("major", "minor", "patch", "prerelease"):
+    try:
+        setattr(shared, field, 9)
+        assert False, f"{field} should be read-only"
+    except AttributeError:
+        pass
+assert SemVer("3.1.4-rc.1").major == 3 and SemVer("3.1.4-rc.1") < SemVer("3.1.4")
+parsed, invalid = parse_many(["1.2.3", "nope", "2.0.0-rc.1", "1.2.3", "1.2", None])
+assert [str(v) for v in parsed] == ["1.2.3", "2.0.0-rc.1", "1.2.3"]
+assert parsed[0] is parsed[2]
+assert invalid == [(1, "nope"), (4, "1.2"), (5, None)]
+parsed, invalid = parse_many([b"1.2.3", ["1.2.3"], "1.2.3"])
+assert [str(v) for v in parsed] == ["1.2.3"] and invalid == [(0, b"1.2.3"), (1, ["1.2.3"])]
+
 print("ALL TESTS PASSED")
@@ -0,0 +1,103 @@
+import io
+import time
+
+from tokenizer import IncrementalTokenizer, iter_tokens, tokenize
+
+# Existing list API
+assert tokenize('name = alice and (age > 30)') == [
+    ("IDENT", "name"), ("OP", "="), ("STRING", "alice"), ("IDENT", "and"),
+    ("LPAREN", "("), ("IDENT", "age"), ("OP", ">"), ("NUMBER", "30"), ("RPAREN", ")"),
+]
+
+# Streaming: same tokens, plus absolute positions
+text = 'city = "New \\"York\\"" or zip=10001'
+expected = tokenize(text)
+assert [(k, v) for k, v, _ in iter_tokens(text)] == expected
+assert list(iter_tokens(text))[2] == ("STRING", 'New "York"', 7)
+
+# Tokens spanning chunk boundaries (file object and chunk iterable)
+for size in (1, 2, 5, 64):
+    assert [(k, v) for k, v, _ in iter_tokens(io.StringIO(text), chunk_size=size)] == expected
+chunks = [text[i:i + 3] for i in range(0, len(text), 3)]
+assert list(iter_tokens(chunks)) == list(iter_tokens(text))
+
+# Errors match tokenize(), with absolute positions
+for bad in ['a = "open', 'x ? y']:
+    try:
+        tokenize(bad)
+        assert False, "Should have raised ValueError"
+    except ValueError as exc:
+        message = str(exc)
+    try:
+        list(iter_tokens(io.StringIO(bad), chunk_size=2))
+        assert False, "Should have raised ValueError"
+    except ValueError as exc:
+        assert str(exc) == message, (str(exc), message)
+
+# tokenize()'s Unicode classes: "²" is a digit, "½" starts no token
+def outcome(fn):
+    try:
+        return fn()
+    except ValueError as exc:
+        return str(exc)
+
+assert tokenize("a=² x²") == [("IDENT", "a"), ("OP", "="), ("NUMBER", "²"), ("IDENT", "x²")]
+assert outcome(lambda: tokenize("½")) == "Unexpected character at position 0: '½'"
+for odd in ["x² 2²", "²3 = ½", "a=²", "½", "é=五 Ⅻ", "٣٤ + 2²x", "ab 12²3"]:
+    expected = outcome(lambda: tokenize(odd))
+    for size in (1, 2, 64):
+        got = outcome(lambda: [(k, v) for k, v, _ in iter_tokens(odd, chunk_size=size)])
+        assert got == expected, (odd, size, got, expected)
+
+# A literal spanning many chunks is scanned once, not once per chunk
+for body in ["x" * 1_000_000, 'ab\\"c' * 200_000]:
+    long_text = 'a = "' + body + '" b'
+    start = time.perf_counter()
+    tokens = list(iter_tokens(io.StringIO(long_text), chunk_size=4096))
+    assert time.perf_counter() - start < 5, "rescanning the pending literal per chunk"
+    assert [(k, v) for k, v, _ in tokens] == tokenize(long_text)
+word = "w" * 1_000_000
+start = time.perf_counter()
+assert list(iter_tokens(io.StringIO(word), chunk_size=4096)) == [("IDENT", word, 0)]
+assert time.perf_counter() - start < 5
+
+# Incremental feed/close: tokens are emitted as soon as they are complete
+tok = IncrementalTokenizer()
+assert tok.feed('city = "New \\"Yo') == [("IDENT", "city", 0), ("OP", "=", 5)]
+assert tok.pending == len(' "New \\"Yo')
+assert tok.feed('rk\\"" or zi') == [("STRING", 'New "York"', 7), ("IDENT", "or", 22)]
+assert tok.feed("p=10001") == [("IDENT", "zip", 25), ("OP", "=", 28)]
+assert tok.close() == [("NUMBER", "10001", 29)]
+assert tok.close() == []
+try:
+    tok.feed("x")
+    assert False, "Should have raised ValueError"
+except ValueError:
+    pass
+
+# feed() is linear in the input: a long literal is not rescanned per chunk
+piece = "y" + "\\" * 4095  # odd run: every chunk ends inside an escape
+long_text = 's = "' + piece * 250 + 'z" t'
+tok = IncrementalTokenizer()
+tokens = tok.feed('s = "')
+assert tokens == [("IDENT", "s", 0), ("OP", "=", 2)]
+start = time.perf_counter()
+for _ in range(250):
+    assert tok.feed(piece) == []
+assert time.perf_counter() - start < 5, "rescanning the pending literal per feed"
+assert tok.pending == 2 + 250 * 4096
+tokens += tok.feed('z" t') + tok.close()
+assert [(k, v) for k, v, _ in tokens] == tokenize(long_text)
+assert tokens[-1] == ("IDENT", "t", len(long_text) - 1)
+
+# A token that never completes cannot grow the buffer past max_pending
+tok = IncrementalTokenizer(max_pending=16)
+tok.feed('a = "')
+try:
+    for _ in range(10):
+        tok.feed("x" * 4)
+    assert False, "Should have raised ValueError"
+except ValueError as exc:
+    assert "position 4" in str(exc), exc
+
+print("ALL TESTS PASSED")
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Chunked reading of text for the streaming tokenizer and numeral rewriter.
+
+A source is a string, a text file object or an iterable of string chunks.
+Word-at-a-time consumers hold back a trailing run of word characters
+(``\\w``) until the next chunk shows whether it continues.
+"""
+
+import re
+from typing import Iterable, Iterator, TextIO
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+_WORD_CHAR = re.compile(r"\w").match
+_WORD_RUN = re.compile(r"\w*").match
+
+
+def iter_chunks(source: "str | TextIO | Iterable[str]", chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+    """Yield ``source`` in pieces of at most ``chunk_size`` (iterables as given)."""
+    if isinstance(source, str):
+        for start in range(0, len(source), chunk_size):
+            yield source[start:start + chunk_size]
+    elif hasattr(source, "read"):
+        yield from iter(lambda: source.read(chunk_size), "")
+    else:
+        yield from source
+
+
+def is_word_run(text: str) -> bool:
+    """True if ``text`` is empty or consists only of word characters."""
+    return _WORD_RUN(text).end() == len(text)
+
+
+def trailing_word_start(text: str) -> int:
+    """Index where the run of word characters ending ``text`` begins."""
+    cut = len(text)
+    while cut and _WORD_CHAR(text, cut - 1):
+        cut -= 1
+    return cut
+
+
+def whole_words(chunks: Iterable[str]) -> Iterator[str]:
+    """Re-split ``chunks`` so that no word is divided between two pieces.
+
+    Chunks of only word characters are collected without rescanning, and
+    other chunks are searched back only over their own tail, so a word
+    spanning many chunks costs time linear in its length.
+    """
+    pending: list[str] = []  # pieces of a word that may continue
+    for chunk in chunks:
+        if is_word_run(chunk):
+            pending.append(chunk)
+            continue
+        cut = trailing_word_start(chunk)  # > 0: the chunk has a non-word character
+        pending.append(chunk[:cut])
+        yield "".join(pending)
+        pending = [chunk[cut:]]
+    text = "".join(pending)
+    if text:
+        yield text
@@ -1,5 +1,81 @@
 #!/usr/bin/env python3
 
+import re
+import sys
+from array import array
+from functools import lru_cache
+from typing import Iterable, Iterator, TextIO
+
+from textstream import DEFAULT_CHUNK_SIZE, is_word_run, iter_chunks, trailing_word_start
+
+# One alternative per token kind. The string pattern is the unrolled
+# "[^"\\]*(\\.[^"\\]*)*" form, which cannot backtrack catastrophically.
+# Leading whitespace is skipped inside the match; a bare \Z match means only
+# whitespace was left.
+_MASTER_TEMPLATE = (
+    r"""\s*(?:(\()"""
+    r"""|(\))"""
+    r"""|([-+*/=<>!])"""
+    r"""|("[^"\\]*(?:\\[\s\S][^"\\]*)*")"""
+    r"""|({number})"""
+    r"""|({ident})"""
+    r"""|\Z)"""
+)
+_KINDS = (None, "LPAREN", "RPAREN", "OP", "STRING", "NUMBER", "IDENT")
+
+# Fast path: split() on one capturing group alternates gap, token, gap, ...
+_FAST_TEMPLATE = r"""("[^"\\]*(?:\\[\s\S][^"\\]*)*"|{ident}|{number}|[-+*/=<>!()])"""
+
+# tokenize() reads digits as str.isdigit() and identifiers as str.isalpha()
+# or "_" followed by str.isalnum() or "_". The regexes' \d is only
+# str.isdecimal(), so the two differ on numeric characters that are neither
+# letters nor decimal digits, such as "²" (a digit) or "½" (not one). Text
+# without them, by far the common case, uses the plain patterns.
+_MASTER_RE = re.compile(_MASTER_TEMPLATE.format(number=r"\d+", ident=r"[^\W\d]\w*"))
+_FAST_RE = re.compile(_FAST_TEMPLATE.format(number=r"\d+", ident=r"[^\W\d]\w*"))
+# Word characters other than letters, "_" and decimal digits: a superset
+# check, since non-ASCII letters match too.
+_ODD_WORD_CHARS = re.compile(r"[^\W\da-zA-Z_]").findall
+
+
+def _needs_unicode_patterns(text: str) -> bool:
+    return not all(ch.isalpha() for ch in set(_ODD_WORD_CHARS(text)))
+
+
+@lru_cache(maxsize=None)
+def _unicode_patterns() -> tuple[re.Pattern, re.Pattern]:
+    """(master, fast) patterns using tokenize()'s exact character classes.
+
+    Built on first use by listing every numeric character that is not a
+    letter or decimal digit; that takes a few tenths of a second.
+    """
+    codepoints = array("I", range(sys.maxunicode + 1)).tobytes()
+    everything = codepoints.decode(f"utf-32-{sys.byteorder[0]}e", "surrogatepass")
+    odd = "".join(ch for ch in set(_ODD_WORD_CHARS(everything)) if not ch.isalpha())
+    digits = "".join(ch for ch in odd if ch.isdigit())
+    number = rf"[\d{re.escape(digits)}]+"
+    ident = rf"[^\W\d{re.escape(odd)}]\w*"
+    return (
+        re.compile(_MASTER_TEMPLATE.format(number=number, ident=ident)),
+        re.compile(_FAST_TEMPLATE.format(number=number, ident=ident)),
+    )
+
+_SINGLE_CHAR_KINDS = {"(": "LPAREN", ")": "RPAREN", **{op: "OP" for op in "+-*/=<>!"}}
+# split() keeps only the escaped character of each escape, so joining the
+# parts unescapes a string body without a per-escape callback.
+_ESCAPE_RE = re.compile(r"\\([\s\S])")
+# The body of a string after its opening quote; it stops at the closing
+# quote, or at a final backslash whose escaped character has not arrived.
+_STRING_REST_RE = re.compile(r"""[^"\\]*(?:\\[\s\S][^"\\]*)*""")
+
+# Kinds whose match may continue into the next chunk.
+_EXTENDABLE = frozenset({"NUMBER", "IDENT"})
+
+
+# Streaming tokens are plain (kind, value, pos) tuples: building a NamedTuple
+# per token costs several times more than the scan itself.
+Token = tuple[str, str, int]
+
 
 def tokenize(text: str):
     tokens = []
@@ -69,3 +145,229 @@ def tokenize(text: str):
         raise ValueError(f"Unexpected character at position {i}: {ch!r}")
 
     return tokens
+
+
+class _Scanner:
+    """Chunk-at-a-time scanning state shared by the streaming tokenizers.
+
+    ``buf`` holds only input not yet turned into tokens and ``base`` is the
+    absolute offset of ``buf[0]``. ``after_eq`` records whether the last
+    token was ``OP "="`` (an identifier after it becomes a STRING).
+
+    A token that may continue past the end of the input (a trailing word
+    or an unclosed string) is held back. Later chunks that cannot finish it
+    are looked at once and parked in ``more`` rather than appended to
+    ``buf``, so a token spanning many chunks costs time linear in its
+    length. ``in_string`` is set while a closing quote is awaited, and
+    ``escaped`` when the input so far ends inside an escape sequence.
+    ``master_re``/``fast_re`` switch to the exact Unicode patterns for good
+    once the input needs them.
+    """
+
+    __slots__ = ("buf", "base", "after_eq", "more", "more_len", "in_string", "escaped", "master_re", "fast_re")
+
+    def __init__(self) -> None:
+        self.buf = ""
+        self.base = 0
+        self.after_eq = False
+        self.more: list[str] = []
+        self.more_len = 0
+        self.in_string = False
+        self.escaped = False
+        self.master_re = _MASTER_RE
+        self.fast_re = _FAST_RE
+
+    @property
+    def pending(self) -> int:
+        return len(self.buf) + self.more_len
+
+    def push(self, chunk: str) -> Iterator[Token]:
+        """Add a non-empty chunk and return the tokens it completes."""
+        if self.in_string:
+            end = _STRING_REST_RE.match(chunk, 1 if self.escaped else 0).end()
+            if end == len(chunk) or chunk[end] == "\\":
+                self.escaped = end < len(chunk)
+                return self._park(chunk)
+            self.in_string = False
+        elif is_word_run(chunk):
+            return self._park(chunk)  # only word characters: the held-back word grows
+        if self.more:
+            self.buf = "".join((self.buf, *self.more, chunk))
+            self.more = []
+            self.more_len = 0
+        else:
+            self.buf += chunk
+        return self.scan(final=False)
+
+    def finish(self) -> Iterator[Token]:
+        """Return the remaining tokens at end of input."""
+        if self.more:
+            self.buf = "".join((self.buf, *self.more))
+            self.more = []
+            self.more_len = 0
+        self.in_string = False
+        return self.scan(final=True)
+
+    def _park(self, chunk: str) -> Iterator[Token]:
+        self.more.append(chunk)
+        self.more_len += len(chunk)
+        return iter(())
+
+    def scan(self, final: bool) -> Iterator[Token]:
+        """Yield the complete tokens in ``buf``, keeping any that may continue.
+
+        Unless ``final``, a NUMBER or IDENT running to the end of the buffer,
+        or an unclosed string, is held back until more input arrives.
+        """
+        if self.fast_re is _FAST_RE and _needs_unicode_patterns(self.buf):
+            self.master_re, self.fast_re = _unicode_patterns()
+        tokens = self._scan_fast(final)
+        if tokens is None:
+            return self._scan_exact(final)
+        return iter(tokens)
+
+    def _scan_fast(self, final: bool) -> list[Token] | None:
+        """Tokenize with one split() call; None if the input needs _scan_exact.
+
+        Every gap between tokens must be whitespace; anything else (a bad
+        character, an unclosed string) falls back to the exact scanner for
+        the error or hold-back.
+        """
+        buf = self.buf
+        # Hold back a trailing word: it may continue in the next chunk.
+        cut = len(buf) if final else trailing_word_start(buf)
+
+        parts = self.fast_re.split(buf[:cut] if cut < len(buf) else buf)
+        if "".join(parts[::2]).strip():
+            return None
+
+        after_eq = self.after_eq
+        tokens = []
+        append = tokens.append
+        pos = self.base
+        parts = iter(parts)
+        for gap in parts:
+            pos += len(gap)
+            token = next(parts, None)
+            if token is None:
+                break
+            kind = _SINGLE_CHAR_KINDS.get(token)
+            if kind is not None:
+                after_eq = token == "="
+                append((kind, token, pos))
+                pos += 1
+                continue
+            first = token[0]
+            if first == '"':
+                value = token[1:-1]
+                append(("STRING", "".join(_ESCAPE_RE.split(value)) if "\\" in value else value, pos))
+            elif first.isdigit():
+                append(("NUMBER", token, pos))
+            else:
+                append(("STRING" if after_eq else "IDENT", token, pos))
+            after_eq = False
+            pos += len(token)
+
+        self.buf = buf[cut:]
+        self.base += cut
+        self.after_eq = after_eq
+        return tokens
+
+    def _scan_exact(self, final: bool) -> Iterator[Token]:
+        buf = self.buf
+        base = self.base
+        after_eq = self.after_eq
+        n = len(buf)
+        pos = 0
+        try:
+            for m in self.master_re.finditer(buf):
+                if m.start() != pos:
+                    break  # the search skipped text that starts no token
+                index = m.lastindex
+                if index is None:  # only whitespace left
+                    pos = n
+                    break
+                end = m.end()
+                kind = _KINDS[index]
+                if end == n and not final and kind in _EXTENDABLE:
+                    return
+                value = m.group(index)
+                if kind == "STRING":
+                    value = "".join(_ESCAPE_RE.split(value[1:-1]))
+                elif kind == "IDENT" and after_eq:
+                    kind = "STRING"
+                after_eq = kind == "OP" and value == "="
+                yield (kind, value, base + m.start(index))
+                pos = end
+
+            if pos < n:
+                bad = n - len(buf[pos:].lstrip())
+                if buf[bad] != '"':
+                    raise ValueError(f"Unexpected character at position {base + bad}: {buf[bad]!r}")
+                if final:
+                    raise ValueError(f"Unterminated string starting at position {base + bad}")
+                self.in_string = True
+                self.escaped = _STRING_REST_RE.match(buf, bad + 1).end() < n
+        finally:
+            self.buf = buf[pos:]
+            self.base = base + pos
+            self.after_eq = after_eq
+
+
+class IncrementalTokenizer:
+    """Push-style tokenizer for input that arrives in pieces (e.g. a socket).
+
+    ``feed(chunk)`` returns every token completed so far and ``close()``
+    returns the rest, so tokens are available before the payload ends.
+    Tokens, positions and errors are the same as iter_tokens(). Only the
+    unfinished tail is buffered; pass ``max_pending`` to reject a single
+    token (typically an unterminated string) that grows past that many
+    characters.
+    """
+
+    def __init__(self, max_pending: int | None = None) -> None:
+        self.max_pending = max_pending
+        self._scanner = _Scanner()
+        self._closed = False
+
+    @property
+    def pending(self) -> int:
+        """Number of buffered characters not yet emitted as tokens."""
+        return self._scanner.pending
+
+    @property
+    def position(self) -> int:
+        """Absolute offset of the first buffered character."""
+        return self._scanner.base
+
+    def feed(self, chunk: str) -> list[Token]:
+        if self._closed:
+            raise ValueError("feed() called after close()")
+        if not chunk:
+            return []
+        scanner = self._scanner
+        tokens = list(scanner.push(chunk))
+        if self.max_pending is not None and scanner.pending > self.max_pending:
+            start = scanner.base + len(scanner.buf) - len(scanner.buf.lstrip())
+            raise ValueError(f"Token starting at position {start} exceeds {self.max_pending} characters")
+        return tokens
+
+    def close(self) -> list[Token]:
+        if self._closed:
+            return []
+        self._closed = True
+        return list(self._scanner.finish())
+
+
+def iter_tokens(source: "str | TextIO | Iterable[str]", chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Token]:
+    """Lazily yield (kind, value, pos) tuples from a string, text file or chunk iterable.
+
+    Kinds, the ``OP "="`` -> STRING rule and error messages match tokenize();
+    ``pos`` is the absolute character offset. Only the unfinished tail of
+    the input is buffered between chunks.
+    """
+    scanner = _Scanner()
+    for chunk in iter_chunks(source, chunk_size):
+        if chunk:
+            yield from scanner.push(chunk)
+    yield from scanner.finish()